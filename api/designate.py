@@ -13,11 +13,20 @@
 # Python Wrapper for openstack designate. Used in the DNS as a service plugin
 # v.0.1 - Initial Implementation - Marco Caimi <marco.caimi@fastweb.it>
 
+import collections
+import contextlib
+import email.utils
+import functools
 import logging
+import threading
+import time
+from concurrent import futures
 from keystoneauth1.identity import v2 as v2_plugin
 from keystoneauth1.identity import v3 as v3_plugin
+from keystoneauth1 import exceptions as keystone_exceptions
 from keystoneauth1 import session as keystone_session
 from django.conf import settings
+from django.core.cache import cache
 
 # import base api library from openstack dashboard codebase
 from openstack_dashboard.api import base as api_base
@@ -27,6 +36,7 @@ from horizon.utils.memoized import memoized
 
 # import designate SDK libraries
 from designateclient.v2 import client as designate_client
+from designateclient.v2 import utils as designate_utils
 
 LOG = logging.getLogger(__name__)
 
@@ -37,99 +47,651 @@ try:
 except ImportError:
     LOG.error("VERSION.load_supported_versions FAILED.")
 
+# upper bound on concurrent designate calls issued by a single bulk operation
+BULK_CONCURRENCY = getattr(settings, 'DESIGNATE_BULK_CONCURRENCY', 8)
+
+# page size asked for when polling the status of a batch of zones (designate
+# caps list pages at max_limit_v2, 1000 by default)
+ZONE_STATUS_PAGE_SIZE = 1000
+
+# merge concurrent identical read calls into a single upstream request
+COALESCE_READS = getattr(settings, 'DESIGNATE_COALESCE_READS', True)
+
+# outbound rate limiting and concurrency caps for every designate/keystone
+# call made by this process. Rates are requests per second, 0 disables a
+# bucket. Override single keys with DESIGNATE_RATE_LIMITS in local_settings.
+RATE_LIMITS = {
+    'enabled': True,
+    'global_rate': 50.0,
+    'global_burst': 100,
+    'project_rate': 10.0,
+    'project_burst': 20,
+    'max_concurrency': 32,
+    'project_concurrency': 8,
+    'bulk_concurrency': 4,
+    'max_retries': 3,
+    'max_retry_after': 30,
+}
+RATE_LIMITS.update(getattr(settings, 'DESIGNATE_RATE_LIMITS', {}))
+
+# multi-region: seconds to wait for the slowest region when fanning out, and
+# how long the region of a zone is remembered
+REGION_TIMEOUT = getattr(settings, 'DESIGNATE_REGION_TIMEOUT', 10)
+ZONE_REGION_TTL = getattr(settings, 'DESIGNATE_ZONE_REGION_TTL', 3600)
+
 DEBUGLOG=True
 def logwrap_info(message):
     if DEBUGLOG:
         LOG.info("DESIGNATE API WRAPPER: %s" % message)
 
+# single-flight support: while a read call is in progress, identical calls
+# (same project, priority, operation and arguments) made by other threads in this
+# process wait for it and share its result instead of hitting designate-api.
+# Shared results must be treated as read only.
+class _InFlightCall(object):
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight(object):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._stats = collections.defaultdict(lambda: {'calls': 0, 'upstream': 0, 'coalesced': 0})
+
+    def stats(self):
+        with self._lock:
+            return dict((op, dict(counters)) for op, counters in self._stats.items())
+
+    def do(self, key, op, fn, *args, **kwargs):
+        with self._lock:
+            counters = self._stats[op]
+            counters['calls'] += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _InFlightCall()
+                counters['upstream'] += 1
+            else:
+                counters['coalesced'] += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+        return call.result
+
+_SINGLE_FLIGHT = SingleFlight()
+
+# per-operation {'calls', 'upstream', 'coalesced'} counters since process start
+def get_coalescing_stats():
+    return _SINGLE_FLIGHT.stats()
+
+def _project_key(request):
+    return getattr(request.user, 'project_id', None) or getattr(request.user, 'tenant_id', None)
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+def coalesced(func):
+    @functools.wraps(func)
+    def wrapped(request, *args, **kwargs):
+        if not COALESCE_READS:
+            return func(request, *args, **kwargs)
+        # calls only share a flight with calls of the same priority: a page
+        # load must never wait on a bulk call the scheduler holds back for it
+        key = (_project_key(request), current_priority(), func.__name__, _freeze(args), _freeze(kwargs))
+        return _SINGLE_FLIGHT.do(key, func.__name__, func, request, *args, **kwargs)
+    return wrapped
+
+# phase timing hooks for the panel's request profiler. timed_phase() is a
+# no-op unless a profile is attached to the current thread.
+_PHASES = threading.local()
+
+def attach_phase_profile(profile):
+    _PHASES.profile = profile
+
+def detach_phase_profile():
+    _PHASES.profile = None
+
+@contextlib.contextmanager
+def timed_phase(name):
+    profile = getattr(_PHASES, 'profile', None)
+    if profile is None:
+        yield
+        return
+
+    profile.enter(name)
+    try:
+        yield
+    finally:
+        profile.exit()
+
+# outbound scheduler: every HTTP call goes through a global and a per-project
+# token bucket and concurrency cap. Interactive calls (page loads, single
+# form submissions) always go first, bulk calls only run when no interactive
+# call is waiting and at most bulk_concurrency of them at a time.
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 1
+
+class TokenBucket(object):
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.burst = float(max(burst, 1))
+        self.tokens = self.burst
+        self.stamp = time.time()
+        self.paused_until = 0.0
+
+    def delay(self, now):
+        if now < self.paused_until:
+            return self.paused_until - now
+        if self.rate <= 0:
+            return 0.0
+        if now > self.stamp:
+            self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+            self.stamp = now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self):
+        if self.rate > 0:
+            self.tokens -= 1
+
+    def pause(self, until):
+        self.paused_until = max(self.paused_until, until)
+
+class OutboundScheduler(object):
+    def __init__(self, limits):
+        self.limits = limits
+        self._cond = threading.Condition()
+        self._global_bucket = TokenBucket(limits['global_rate'], limits['global_burst'])
+        self._project_buckets = {}
+        self._in_flight = 0
+        self._project_in_flight = collections.Counter()
+        self._bulk_in_flight = 0
+        self._interactive_waiting = 0
+
+    def _project_bucket(self, project):
+        bucket = self._project_buckets.get(project)
+        if bucket is None:
+            bucket = self._project_buckets[project] = TokenBucket(self.limits['project_rate'], self.limits['project_burst'])
+        return bucket
+
+    # seconds to wait before the call can go out, 0 to admit it now and None
+    # to wait until another call completes
+    def _admission_delay(self, project, priority, now):
+        if self._in_flight >= self.limits['max_concurrency']:
+            return None
+        if self._project_in_flight[project] >= self.limits['project_concurrency']:
+            return None
+        if priority == PRIORITY_BULK and (self._interactive_waiting or self._bulk_in_flight >= self.limits['bulk_concurrency']):
+            return None
+        return max(self._global_bucket.delay(now), self._project_bucket(project).delay(now))
+
+    def acquire(self, project, priority):
+        with self._cond:
+            if priority == PRIORITY_INTERACTIVE:
+                self._interactive_waiting += 1
+            try:
+                while True:
+                    delay = self._admission_delay(project, priority, time.time())
+                    if delay == 0:
+                        break
+                    self._cond.wait(delay)
+            finally:
+                if priority == PRIORITY_INTERACTIVE:
+                    self._interactive_waiting -= 1
+
+            self._global_bucket.consume()
+            self._project_bucket(project).consume()
+            self._in_flight += 1
+            self._project_in_flight[project] += 1
+            if priority == PRIORITY_BULK:
+                self._bulk_in_flight += 1
+            # bulk callers blocked on a waiting interactive call re-check now
+            self._cond.notify_all()
+
+    def release(self, project, priority):
+        with self._cond:
+            self._in_flight -= 1
+            self._project_in_flight[project] -= 1
+            if not self._project_in_flight[project]:
+                del self._project_in_flight[project]
+            if priority == PRIORITY_BULK:
+                self._bulk_in_flight -= 1
+            self._cond.notify_all()
+
+    # upstream asked us to slow down: hold the project's bucket until the
+    # Retry-After delay has passed
+    def backoff(self, project, seconds):
+        with self._cond:
+            self._project_bucket(project).pause(time.time() + seconds)
+            self._cond.notify_all()
+
+_SCHEDULER = OutboundScheduler(RATE_LIMITS)
+_PRIORITY = threading.local()
+_SCHEDULED = threading.local()
+
+def current_priority():
+    return getattr(_PRIORITY, 'value', PRIORITY_INTERACTIVE)
+
+# run the designate calls made by this thread as low priority bulk traffic
+@contextlib.contextmanager
+def bulk_operation():
+    previous = current_priority()
+    _PRIORITY.value = PRIORITY_BULK
+    try:
+        yield
+    finally:
+        _PRIORITY.value = previous
+
+def _bulk_call(func, *args, **kwargs):
+    with bulk_operation():
+        return func(*args, **kwargs)
+
+# Retry-After delay in seconds for rate limited responses, None otherwise
+def _retry_after(response):
+    if response.status_code not in (413, 429, 503):
+        return None
+
+    header = response.headers.get('Retry-After')
+    if header is None:
+        # 413 without Retry-After is designate's over quota error
+        return 1.0 if response.status_code == 429 else None
+
+    try:
+        seconds = float(header)
+    except ValueError:
+        parsed = email.utils.parsedate_tz(header)
+        if parsed is None:
+            return 1.0
+        seconds = email.utils.mktime_tz(parsed) - time.time()
+
+    return min(max(seconds, 0.0), RATE_LIMITS['max_retry_after'])
+
+class ScheduledSession(keystone_session.Session):
+    def __init__(self, project=None, **kwargs):
+        super(ScheduledSession, self).__init__(**kwargs)
+        self.project = project
+
+    def request(self, url, method, **kwargs):
+        # keystoneauth fetches tokens with authenticated=False
+        with timed_phase('keystone' if kwargs.get('authenticated') is False else 'api'):
+            return self._scheduled_request(url, method, **kwargs)
+
+    def _scheduled_request(self, url, method, **kwargs):
+        # nested calls (the keystone token fetch triggered by a designate
+        # call) run inside the slot already held by this thread
+        if not RATE_LIMITS['enabled'] or getattr(_SCHEDULED, 'active', False):
+            return super(ScheduledSession, self).request(url, method, **kwargs)
+
+        raise_exc = kwargs.pop('raise_exc', True)
+        priority = current_priority()
+        retries = 0
+        while True:
+            with timed_phase('throttle'):
+                _SCHEDULER.acquire(self.project, priority)
+            _SCHEDULED.active = True
+            try:
+                response = super(ScheduledSession, self).request(url, method, raise_exc=False, **kwargs)
+            finally:
+                _SCHEDULED.active = False
+                _SCHEDULER.release(self.project, priority)
+
+            retry_after = _retry_after(response)
+            if retry_after is None or retries >= RATE_LIMITS['max_retries']:
+                break
+
+            retries += 1
+            logwrap_info("Rate limited by upstream (HTTP %d), retrying %s %s in %.1fs." % (response.status_code, method, url, retry_after))
+            _SCHEDULER.backoff(self.project, retry_after)
+
+        if raise_exc and response.status_code >= 400:
+            raise keystone_exceptions.from_response(response, method, url)
+        return response
+
+# keystone endpoint used to scope designate sessions. Defaults to the public
+# keystone listener on OPENSTACK_HOST, can be overridden in local_settings.
+def keystone_endpoint():
+    return getattr(settings, 'DESIGNATE_KEYSTONE_ENDPOINT', "https://%s:5000" % settings.OPENSTACK_HOST)
+
 # wrapper around designate DNS as a service API set
+# all_projects=True returns a client that lists resources across every project
+# (requires the designate "all_tenants" policy). region selects the dns
+# endpoint of the service catalog, None lets keystoneauth pick one.
+def designateclient(request, all_projects=False, region=None):
+    with timed_phase('keystone'):
+        return _designateclient(request, all_projects, region)
+
 @memoized
-def designateclient(request):
+def _designateclient(request, all_projects, region):
     token = request.user.token.id
 
     if keystone.get_version() < 3:
         tenant_id = request.user.tenant_id
         logwrap_info("using keystone v2.")
         # keystone auth object
-        auth = v2_plugin.Token(auth_url="https://%s:5000/v2.0" % settings.OPENSTACK_HOST, 
+        auth = v2_plugin.Token(auth_url="%s/v2.0" % keystone_endpoint(),
                                 tenant_id=tenant_id, 
                                 token=token)
     else:
         project_id = request.user.project_id
         project_domain_id = request.session.get('domain_context')
         logwrap_info("using keystone v3.")
-        auth = v3_plugin.Token(auth_url="https://%s:5000/v3" % settings.OPENSTACK_HOST,
+        auth = v3_plugin.Token(auth_url="%s/v3" % keystone_endpoint(),
                                 token=token,
                                 project_id=project_id,
                                 project_domain_id=project_domain_id)
 
-    # create a session
-    ks_session = keystone_session.Session(auth=auth)
+    # create a session, its calls go through the outbound scheduler
+    ks_session = ScheduledSession(auth=auth, project=_project_key(request))
 
     # spawn designate client object
-    dns_client = designate_client.Client(session=ks_session)
+    dns_client = designate_client.Client(session=ks_session, region_name=region, all_projects=all_projects)
 
     logwrap_info("Created a new DNSaaS API Client Object.")
     return dns_client
 
-def get_zones(request):
+# regions with a dns endpoint in the user's service catalog
+def get_dns_regions(request):
+    regions = []
+    for service in getattr(request.user, 'service_catalog', None) or []:
+        if service.get('type') != 'dns':
+            continue
+        for endpoint in service.get('endpoints', []):
+            region = endpoint.get('region_id') or endpoint.get('region')
+            if region and region not in regions:
+                regions.append(region)
+    return regions
+
+def _zone_region_key(request, zone):
+    return "dns_zone_region:%s:%s" % (_project_key(request), zone)
+
+def _remember_zone_regions(request, zones):
+    cache.set_many(dict((_zone_region_key(request, zone.get('id')), zone.get('region')) for zone in zones), ZONE_REGION_TTL)
+
+# ask every region for the zone at once, the first one that has it wins
+def _probe_zone_region(request, zone, regions):
+    executor = futures.ThreadPoolExecutor(max_workers=len(regions))
+    calls = dict((executor.submit(designateclient(request, False, region).zones.get, zone), region) for region in regions)
+    try:
+        for future in futures.as_completed(calls, timeout=REGION_TIMEOUT):
+            if future.exception() is None:
+                return calls[future]
+    except futures.TimeoutError:
+        pass
+    finally:
+        executor.shutdown(wait=False)
+    return None
+
+# region hosting a zone. None on single region clouds, where the client
+# picks the only dns endpoint as it always did.
+def zone_region(request, zone):
+    regions = get_dns_regions(request)
+    if len(regions) <= 1:
+        return None
+
+    key = _zone_region_key(request, zone)
+    region = cache.get(key)
+    if region is None:
+        region = _probe_zone_region(request, zone, regions)
+        if region is not None:
+            cache.set(key, region, ZONE_REGION_TTL)
+    return region
+
+def _zone_client(request, zone):
+    return designateclient(request, False, zone_region(request, zone))
+
+# the user's services region: new zones are created there and neutron lists
+# floating ips from it. None on single region clouds.
+def _home_region(request):
+    if len(get_dns_regions(request)) <= 1:
+        return None
+    return getattr(request.user, 'services_region', None)
+
+def _home_client(request):
+    return designateclient(request, False, _home_region(request))
+
+# floating ip ids are "<region>:<neutron id>"
+def _floatingip_client(request, floatingip_id):
+    region = floatingip_id.partition(':')[0] if len(get_dns_regions(request)) > 1 else None
+    return designateclient(request, False, region or None)
+
+@coalesced
+def get_zones(request, region=None):
     logwrap_info("Querying API service for a list of zones.")
-    return designateclient(request).zones.list()
+    return designateclient(request, False, region).zones.list()
+
+# list zones in every region concurrently. A region that fails or does not
+# answer within REGION_TIMEOUT is skipped, so the call takes as long as the
+# slowest healthy region. Returns (zones, failed_regions), each zone being a
+# copy of the API result with an added "region" key.
+def get_zones_all_regions(request):
+    regions = get_dns_regions(request)
+    if len(regions) <= 1:
+        region = regions[0] if regions else getattr(request.user, 'services_region', None)
+        return [dict(zone, region=region) for zone in get_zones(request)], []
+
+    logwrap_info("Querying %d regions for a list of zones." % len(regions))
+    # build the clients up front instead of racing on the memoized cache
+    for region in regions:
+        designateclient(request, False, region)
+
+    executor = futures.ThreadPoolExecutor(max_workers=len(regions))
+    calls = dict((executor.submit(get_zones, request, region), region) for region in regions)
+    done, not_done = futures.wait(calls, timeout=REGION_TIMEOUT)
+    executor.shutdown(wait=False)
+
+    zones = []
+    failed_regions = []
+    for future, region in calls.items():
+        if future in not_done:
+            LOG.warning("DESIGNATE API WRAPPER: region %s did not answer within %ss." % (region, REGION_TIMEOUT))
+            failed_regions.append(region)
+        elif future.exception() is not None:
+            LOG.warning("DESIGNATE API WRAPPER: region %s failed: %s" % (region, future.exception()))
+            failed_regions.append(region)
+        else:
+            zones.extend(dict(zone, region=region) for zone in future.result())
+
+    _remember_zone_regions(request, zones)
+    return zones, sorted(failed_regions)
+
+# list zones across all projects, one page at a time. Filters in criterion
+# (e.g. status, type, name) are evaluated by designate. Returns (zones, has_more).
+def get_all_zones(request, marker=None, criterion=None, paginate=True):
+    # the page size is a per-user setting: it is passed down as the limit so
+    # that it is part of the coalescing key
+    page_size = utils.get_page_size(request)
+    limit = page_size + 1 if paginate else None
 
+    zones = _list_all_zones(request, marker, criterion, limit)
+    has_more = False
+    if paginate and len(zones) > page_size:
+        zones = zones[:page_size]
+        has_more = True
+
+    return zones, has_more
+
+@coalesced
+def _list_all_zones(request, marker, criterion, limit):
+    logwrap_info("Querying API service for a list of zones in all projects.")
+    return list(designateclient(request, True).zones.list(criterion=criterion, marker=marker, limit=limit))
+
+@coalesced
 def get_zone(request, zone=None):
     if zone==None:
         raise ValueError
 
     logwrap_info("Querying API service for info on zone %s" % zone)
-    return designateclient(request).zones.get(zone)
+    return _zone_client(request, zone).zones.get(zone)
 
 def create_zone(request, name, email=None, ttl=None, description=None):
     try:
         logwrap_info("Creating zone %s." % name)
-        designateclient(request).zones.create(name=name, email=email, ttl=ttl, description=description)
+        zone = _home_client(request).zones.create(name=name, email=email, ttl=ttl, description=description)
+        if _home_region(request) is not None:
+            _remember_zone_regions(request, [dict(zone, region=_home_region(request))])
+        return zone
     except Exception as e:
         raise e
 
+# create many zones concurrently with bounded parallelism. zones is a list of
+# dicts with name, email, ttl and description keys. Returns a
+# {name: (created zone or None, exception or None)} map.
+def create_zones(request, zones):
+    logwrap_info("Creating %d zones." % len(zones))
+    # build the client once, before the worker threads share it
+    _home_client(request)
+
+    outcome = {}
+    with futures.ThreadPoolExecutor(max_workers=BULK_CONCURRENCY) as executor:
+        pending = dict((executor.submit(_bulk_call, create_zone, request, zone['name'], zone.get('email'), zone.get('ttl'), zone.get('description')), zone['name'])
+                       for zone in zones)
+        for future in futures.as_completed(pending):
+            error = future.exception()
+            outcome[pending[future]] = (future.result() if error is None else None, error)
+
+    return outcome
+
+# status and action of many zones from a single listing (a few pages at
+# most), instead of one get_zone call per zone
+def get_zone_statuses(request, zone_ids):
+    logwrap_info("Querying API for the status of %d zones." % len(zone_ids))
+    wanted = set(zone_ids)
+    statuses = {}
+    marker = None
+    while True:
+        page = _home_client(request).zones.list(marker=marker, limit=ZONE_STATUS_PAGE_SIZE)
+        for zone in page:
+            if zone.get('id') in wanted:
+                statuses[zone['id']] = {'status': zone.get('status'), 'action': zone.get('action'), 'serial': zone.get('serial')}
+        # designate may cap pages below ZONE_STATUS_PAGE_SIZE (max_limit_v2):
+        # only the next link tells whether there is more
+        if len(statuses) == len(wanted) or not getattr(page, 'next_page', False) or not page:
+            break
+        marker = page.next_link_criterion.get('marker') or page[-1]['id']
+
+    return statuses
+
 def update_zone(request, zone, data):
     try:
         logwrap_info("Updating zone %s." % zone)
-        designateclient(request).zones.update(zone=zone, values=data)
+        _zone_client(request, zone).zones.update(zone=zone, values=data)
     except Exception as e:
         raise e
 
 def delete_zone(request, zone):
     try:
         logwrap_info("Deleting zone %s." % zone)
-        designateclient(request).zones.delete(zone=zone)
+        _zone_client(request, zone).zones.delete(zone=zone)
     except Exception as e:
         raise e
 
+@coalesced
 def get_recordsets(request, zone):
     logwrap_info("Querying API for a list of recordsets in zone %s." % zone)
-    return designateclient(request).recordsets.list(zone=zone)
+    return _zone_client(request, zone).recordsets.list(zone=zone)
+
+# every page of the recordset listing, get_recordsets only returns the first
+@coalesced
+def get_all_recordsets(request, zone):
+    logwrap_info("Querying API for all recordsets in zone %s." % zone)
+    return designate_utils.get_all(_zone_client(request, zone).recordsets.list, args=[zone])
 
+@coalesced
+def get_pending_recordsets(request, zone):
+    logwrap_info("Querying API for pending recordsets in zone %s." % zone)
+    return designate_utils.get_all(_zone_client(request, zone).recordsets.list, criterion={'status': 'PENDING'}, args=[zone])
+
+@coalesced
+def get_zone_nameservers(request, zone):
+    logwrap_info("Querying API for the nameservers of zone %s." % zone)
+    return _zone_client(request, zone).nameservers.list(zone)
+
+@coalesced
 def get_record(request, zone, record):
     logwrap_info("Querying API for a info on recordset %s in zone %s." % (record, zone))
-    return designateclient(request).recordsets.get(zone, record)
+    return _zone_client(request, zone).recordsets.get(zone, record)
 
 def create_recordset(request, zone, name, type_, records, description=None, ttl=None):
     try:
         logwrap_info("Creating recordset %s in zone %s." % (name, zone))
-        designateclient(request).recordsets.create(zone=zone, name=name, type_=type_, records=records, description=description, ttl=ttl)
+        _zone_client(request, zone).recordsets.create(zone=zone, name=name, type_=type_, records=records, description=description, ttl=ttl)
     except Exception as e:
         raise e
 
 def update_recordset(request, zone, recordset, values):
     try:
         logwrap_info("Updating recordset %s in zone %s." % (recordset, zone))
-        designateclient(request).recordsets.update(zone=zone, recordset=recordset, values=values)
+        _zone_client(request, zone).recordsets.update(zone=zone, recordset=recordset, values=values)
     except Exception as e:
         raise e
 
 def delete_recordset(request, zone, recordset):
     try:
         logwrap_info("Deleting recordset %s in zone %s." % (recordset, zone))
-        designateclient(request).recordsets.delete(zone=zone, recordset=recordset)
+        _zone_client(request, zone).recordsets.delete(zone=zone, recordset=recordset)
     except Exception as e:
         raise e
 
+@coalesced
+def get_floatingip_ptrs(request):
+    logwrap_info("Querying API for the PTR records of all floating ips in the project.")
+    # follow the next links, a single list call only returns the first page
+    # same region as neutron's floating ip list, which the PTRs are joined with
+    return designate_utils.get_all(_home_client(request).floatingips.list)
+
+@coalesced
+def get_floatingip_ptr(request, floatingip_id):
+    logwrap_info("Querying API for the PTR record of floating ip %s." % floatingip_id)
+    return _floatingip_client(request, floatingip_id).floatingips.get(floatingip_id)
+
+def set_floatingip_ptr(request, floatingip_id, ptrdname, description=None, ttl=None):
+    try:
+        logwrap_info("Setting PTR record %s for floating ip %s." % (ptrdname, floatingip_id))
+        return _floatingip_client(request, floatingip_id).floatingips.set(floatingip_id, ptrdname, description=description, ttl=ttl)
+    except Exception as e:
+        raise e
+
+def unset_floatingip_ptr(request, floatingip_id):
+    try:
+        logwrap_info("Unsetting PTR record for floating ip %s." % floatingip_id)
+        _floatingip_client(request, floatingip_id).floatingips.unset(floatingip_id)
+    except Exception as e:
+        raise e
+
+# designate has no bulk PTR endpoint: fan out one set call per floating ip
+# with bounded parallelism. Returns a {floatingip_id: exception or None} map.
+def set_floatingip_ptrs(request, ptrs, description=None, ttl=None):
+    logwrap_info("Setting %d floating ip PTR records." % len(ptrs))
+    # build the clients once, before the worker threads share them
+    for floatingip_id in ptrs:
+        _floatingip_client(request, floatingip_id)
+
+    outcome = {}
+    with futures.ThreadPoolExecutor(max_workers=BULK_CONCURRENCY) as executor:
+        pending = dict((executor.submit(_bulk_call, set_floatingip_ptr, request, floatingip_id, ptrdname, description, ttl), floatingip_id)
+                       for floatingip_id, ptrdname in ptrs.items())
+        for future in futures.as_completed(pending):
+            outcome[pending[future]] = future.exception()
+
+    return outcome
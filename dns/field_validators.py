@@ -19,14 +19,28 @@ from oslo_utils import netutils
 
 LOG = logging.getLogger(__name__)
 
+# precompiled validation patterns, shared by the single and bulk forms
+DOMAIN_NAME_RE = re.compile(r'^(\D+\.){2,5}$', re.IGNORECASE)
+RECORD_NAME_RE = re.compile(r'^(\w+\.){0,5}(\w+)$', re.IGNORECASE)
+EMAIL_ADDRESS_RE = re.compile(r'^(\w+.)+\@(\w+\.){1,5}(\w+)$', re.IGNORECASE)
+PTRDNAME_RE = re.compile(r'^([\w-]+\.){2,}$', re.IGNORECASE)
+
+# placeholders available in PTR name templates
+def ptrdname_placeholders(address):
+    return {
+        'ip': address,
+        'dashed': address.replace('.', '-').replace(':', '-'),
+    }
+
 # global validation helpers.
-# this one validates a string against a regex
+# this one validates a string against a regex, either a pattern string or
+# one of the precompiled patterns above
 def string_validate_by_regex(string_to_validate, regex):
-    if not (isinstance(string_to_validate, str) or isinstance(regex, str)):
+    if not isinstance(string_to_validate, (str, type(u""))):
         return False
 
     # compile regex
-    rp = re.compile(regex, re.IGNORECASE)
+    rp = regex if hasattr(regex, 'match') else re.compile(regex, re.IGNORECASE)
 
     # match
     if rp.match(string_to_validate) is not None:
@@ -36,19 +50,29 @@ def string_validate_by_regex(string_to_validate, regex):
 
 # validate a domain name
 def validate_domain_name(domain_name=""):
-    if not string_validate_by_regex(domain_name, r'^(\D+\.){2,5}$'):
+    if not string_validate_by_regex(domain_name, DOMAIN_NAME_RE):
         raise ValidationError(_("Invalid Domain Name Format."))
 
 # validate a record name
 def validate_record_name(record_name=""):
-    if not string_validate_by_regex(record_name, r'^(\w+\.){0,5}(\w+)$'):
+    if not string_validate_by_regex(record_name, RECORD_NAME_RE):
         raise ValidationError(_("Invalid Record Name Format."))
 
 # validate an email address
 def validate_email_address(email_address=""):
-    if not string_validate_by_regex(email_address, r'^(\w+.)+\@(\w+\.){1,5}(\w+)$'):
+    if not string_validate_by_regex(email_address, EMAIL_ADDRESS_RE):
         raise ValidationError(_("Invalid E-Mail Format."))
 
+# validate a PTR name template, rendered against a sample address
+def validate_ptrdname_template(template="", sample_address="192.0.2.1"):
+    try:
+        ptrdname = template.format(**ptrdname_placeholders(sample_address))
+    except (KeyError, IndexError, ValueError):
+        raise ValidationError(_("Invalid PTR Name Template: unknown placeholder."))
+
+    if not string_validate_by_regex(ptrdname, PTRDNAME_RE):
+        raise ValidationError(_("Invalid PTR Name Template: must render to a fully qualified name ending with '.'."))
+
 # validate an ip address
 def validate_ip_address(ip_address=""):
     if not netutils.is_valid_ipv4(ip_address):
@@ -0,0 +1,52 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import logging
+
+from openstack_dashboard import api
+from openstack_dashboard.api import designate as designate_bridge
+from openstack_dashboard.dashboards.project.dns.tables import DnsData
+
+LOG = logging.getLogger(__name__)
+
+# designate addresses floating ips as "<region>:<neutron floating ip id>"
+def designate_floatingip_id(region, floatingip_id):
+    return "%s:%s" % (region, floatingip_id)
+
+# list the project's floating ips along with their current PTR records.
+# one neutron list and one designate list, joined in memory on the floating
+# ip id, so the cost does not grow with the number of addresses.
+def get_floatingip_ptrs(request):
+    floating_ips = api.network.tenant_floating_ip_list(request)
+
+    ptr_index = {}
+    for ptr in designate_bridge.get_floatingip_ptrs(request):
+        region, _sep, floatingip_id = ptr.get('id', '').rpartition(':')
+        ptr_index[floatingip_id] = (region, ptr)
+
+    default_region = getattr(request.user, 'services_region', None)
+    objects = []
+    for fip in floating_ips:
+        region, ptr = ptr_index.get(fip.id, (default_region, {}))
+        objects.append(DnsData(**{
+            'id': designate_floatingip_id(region, fip.id),
+            'address': fip.ip,
+            'fixed_ip': getattr(fip, 'fixed_ip', None),
+            'instance_id': getattr(fip, 'instance_id', None),
+            'ptrdname': ptr.get('ptrdname'),
+            'ttl': ptr.get('ttl'),
+            'description': ptr.get('description'),
+            'status': ptr.get('status') or "active",
+            'action': ptr.get('action') or "none",
+        }))
+
+    return objects
@@ -12,13 +12,19 @@
 
 import logging
 
+import netaddr
 from django.utils.translation import ugettext_lazy as _
 from horizon import exceptions
 from horizon import forms
 from horizon import messages
 
 from openstack_dashboard.api import designate as designate_bridge
-from openstack_dashboard.dashboards.project.dns.field_validators import validate_ip_address, validate_email_address, validate_domain_name, validate_record_name
+from openstack_dashboard.dashboards.project.dns import floatingips as dns_floatingips
+from openstack_dashboard.dashboards.project.dns import onboarding as dns_onboarding
+from openstack_dashboard.dashboards.project.dns import prefetch as dns_prefetch
+from openstack_dashboard.dashboards.project.dns import reverse as dns_reverse
+from openstack_dashboard.dashboards.project.dns import snapshots as dns_snapshots
+from openstack_dashboard.dashboards.project.dns.field_validators import validate_ip_address, validate_email_address, validate_domain_name, validate_record_name, validate_ptrdname_template, ptrdname_placeholders
 
 LOG = logging.getLogger(__name__)
 
@@ -61,6 +67,8 @@ class RecordSetCreateForm(forms.SelfHandlingForm):
 
         try:
             designate_bridge.create_recordset(request, zone=zone_id, name=recordname, type_=recordtype, records=[record_value,], description=description, ttl=ttl)
+            dns_snapshots.invalidate(request, zone_id=zone_id)
+            dns_prefetch.invalidate(request, zone_id)
             messages.success(request, _('[DNS]: Record Create Request queued for execution.'))
         except:
             exceptions.handle(request, _('[DNS]: Error while submitting Record Create Request.'))
@@ -118,6 +126,8 @@ class RecordSetUpdateForm(forms.SelfHandlingForm):
         # Make an update_record API call to the backend engine
         try:
             designate_bridge.update_recordset(request, zone=zone_id, recordset=recordset_id, values=args)
+            dns_snapshots.invalidate(request, zone_id=zone_id)
+            dns_prefetch.invalidate(request, zone_id)
             messages.success(request, _('[DNS]: Record Update Request queued for execution.'))
             return True
         except:
@@ -149,12 +159,64 @@ class ZoneCreateForm(forms.SelfHandlingForm):
 
         try:
             designate_bridge.create_zone(request, name=zonename, email=email_address, ttl=ttl, description=description)
+            dns_snapshots.invalidate(request)
             messages.success(request, _('[DNS]: Zone Create Request queued for execution.'))
         except:
             exceptions.handle(request, _('[DNS]: Error while submitting Zone Create Request.'))
 
         return True
 
+# Bulk zone create Django form
+class BulkZoneCreateForm(forms.SelfHandlingForm):
+    zones = forms.CharField(label=_("DNS Zones"), required=True, widget=forms.Textarea(attrs={'rows': 12}),
+                            help_text=_("One zone per line: 'name [email] [ttl]'. Lines starting with # are ignored."))
+    email_address = forms.CharField(label=_("Default Registrar E-Mail"), required=False, validators=[validate_email_address])
+    ttl = forms.IntegerField(label=_("Default Zone TTL"), required=False)
+    description = forms.CharField(max_length=255, label=_("Zone Description"), required=False)
+
+    def __init__(self, request, *args, **kwargs):
+        super(BulkZoneCreateForm, self).__init__(request, *args, **kwargs)
+
+        self.batch_id = None
+        self.fields['zones'].initial = ""
+        self.fields['email_address'].initial = ""
+        self.fields['ttl'].initial = 3600
+        self.fields['description'].initial = "DNS Zone"
+
+    def clean(self):
+        cleaned_data = super(BulkZoneCreateForm, self).clean()
+        zones, errors = dns_onboarding.parse_zone_lines(cleaned_data.get('zones') or "",
+                                                        default_email=cleaned_data.get('email_address') or None,
+                                                        default_ttl=cleaned_data.get('ttl'))
+        if errors:
+            raise forms.ValidationError(errors)
+        if not zones:
+            raise forms.ValidationError(_("No zones to create."))
+
+        cleaned_data['parsed_zones'] = zones
+        return cleaned_data
+
+    def handle(self, request, data):
+        LOG.info("dns::forms::BulkZoneCreateForm: RUNNING POST HOOK")
+        description = data.get('description')
+        zones = [dict(zone, description=description) for zone in data.get('parsed_zones')]
+
+        try:
+            outcome = designate_bridge.create_zones(request, zones)
+            dns_snapshots.invalidate(request)
+        except:
+            exceptions.handle(request, _('[DNS]: Error while submitting Bulk Zone Create Request.'))
+            return False
+
+        self.batch_id = dns_onboarding.save_batch(request, outcome)['id']
+        failed = len([name for name, (zone, error) in outcome.items() if error is not None])
+        if failed:
+            messages.warning(request, _('[DNS]: %(failed)d of %(total)d Zone Create Requests failed.') % {'failed': failed, 'total': len(outcome)})
+        else:
+            messages.success(request, _('[DNS]: %d Zone Create Requests queued for execution.') % len(outcome))
+
+        return True
+
 # Zone update Django form
 class ZoneUpdateForm(forms.SelfHandlingForm):
     zone_id = forms.CharField(widget=forms.HiddenInput())
@@ -190,9 +252,155 @@ class ZoneUpdateForm(forms.SelfHandlingForm):
 
         try:
             designate_bridge.update_zone(request, zone=zone_id, data=update_data)
+            dns_snapshots.invalidate(request)
             messages.success(request, _('[DNS]: Zone Update Request queued for execution.'))
         except:
             exceptions.handle(request, _('[DNS]: Error while submitting Zone Update Request.'))
 
         return True
 
+# Floating IP PTR set Django form
+class FloatingIpPtrSetForm(forms.SelfHandlingForm):
+    floatingip_id = forms.CharField(widget=forms.HiddenInput())
+    address = forms.CharField(label=_("Floating IP Address"), required=False, widget=forms.TextInput(attrs={'readonly': 'readonly'}))
+    ptrdname = forms.CharField(max_length=255, label=_("PTR Record Name"), required=True)
+    ttl = forms.IntegerField(label=_("Record TTL"), required=False)
+    description = forms.CharField(max_length=160, label=_("Description"), required=False)
+
+    def __init__(self, request, *args, **kwargs):
+        super(FloatingIpPtrSetForm, self).__init__(request, *args, **kwargs)
+
+        self.fields['floatingip_id'].initial = kwargs.get('initial', {}).get('floatingip_id')
+        try:
+            current_ptr = designate_bridge.get_floatingip_ptr(request, self.fields['floatingip_id'].initial)
+        except Exception as e:
+            LOG.error("Floating IP PTR API Call: %s " % e)
+            raise e
+
+        self.fields['address'].initial = current_ptr.get('address')
+        self.fields['ptrdname'].initial = current_ptr.get('ptrdname') or ""
+        self.fields['ttl'].initial = current_ptr.get('ttl')
+        self.fields['description'].initial = current_ptr.get('description')
+
+    def handle(self, request, data):
+        LOG.info("dns::forms::FloatingIpPtrSetForm: RUNNING POST HOOK")
+        floatingip_id = data.get('floatingip_id')
+        ptrdname = data.get('ptrdname')
+        ttl = data.get('ttl')
+        description = data.get('description')
+
+        try:
+            designate_bridge.set_floatingip_ptr(request, floatingip_id, ptrdname, description=description, ttl=ttl)
+            messages.success(request, _('[DNS]: PTR Record Set Request queued for execution.'))
+            return True
+        except:
+            exceptions.handle(request, _('[DNS]: Error while submitting PTR Record Set Request.'))
+            return False
+
+# Floating IP PTR bulk set Django form
+class FloatingIpPtrBulkSetForm(forms.SelfHandlingForm):
+    ptrdname_template = forms.CharField(max_length=255, label=_("PTR Name Template"), required=True, validators=[validate_ptrdname_template],
+                                        help_text=_("Available placeholders: {ip} and {dashed}, e.g. '{dashed}.cloud.example.com.'"))
+    ttl = forms.IntegerField(label=_("Record TTL"), required=False)
+    description = forms.CharField(max_length=160, label=_("Description"), required=False)
+    overwrite = forms.BooleanField(label=_("Overwrite existing PTR records"), required=False)
+
+    def __init__(self, request, *args, **kwargs):
+        super(FloatingIpPtrBulkSetForm, self).__init__(request, *args, **kwargs)
+
+        self.fields['ptrdname_template'].initial = ""
+        self.fields['ttl'].initial = 3600
+        self.fields['description'].initial = ""
+        self.fields['overwrite'].initial = False
+
+    def handle(self, request, data):
+        LOG.info("dns::forms::FloatingIpPtrBulkSetForm: RUNNING POST HOOK")
+        template = data.get('ptrdname_template')
+        overwrite = data.get('overwrite')
+
+        try:
+            ptrs = {}
+            for fip in dns_floatingips.get_floatingip_ptrs(request):
+                if fip.ptrdname and not overwrite:
+                    continue
+                ptrs[fip.id] = template.format(**ptrdname_placeholders(fip.address))
+
+            outcome = designate_bridge.set_floatingip_ptrs(request, ptrs, description=data.get('description'), ttl=data.get('ttl'))
+        except:
+            exceptions.handle(request, _('[DNS]: Error while submitting PTR Record Bulk Set Request.'))
+            return False
+
+        failed = [fip_id for fip_id, error in outcome.items() if error is not None]
+        if failed:
+            messages.warning(request, _('[DNS]: %(failed)d of %(total)d PTR Record Set Requests failed.') % {'failed': len(failed), 'total': len(outcome)})
+        else:
+            messages.success(request, _('[DNS]: %d PTR Record Set Requests queued for execution.') % len(outcome))
+
+        return True
+
+# Reverse zone PTR generator Django form
+class ReverseZoneGenerateForm(forms.SelfHandlingForm):
+    zone_id = forms.CharField(widget=forms.HiddenInput())
+    cidr = forms.CharField(max_length=64, label=_("Network (CIDR)"), required=True)
+    ptrdname_template = forms.CharField(max_length=255, label=_("PTR Name Template"), required=True, validators=[validate_ptrdname_template],
+                                        help_text=_("Available placeholders: {ip} and {dashed}, e.g. 'host-{dashed}.example.com.'"))
+    ttl = forms.IntegerField(label=_("Record TTL"), required=False)
+
+    def __init__(self, request, *args, **kwargs):
+        super(ReverseZoneGenerateForm, self).__init__(request, *args, **kwargs)
+
+        self.fields['zone_id'].initial = kwargs.get('initial', {}).get('zone_id')
+        self.fields['cidr'].initial = ""
+        self.fields['ptrdname_template'].initial = ""
+        self.fields['ttl'].initial = 3600
+
+    def clean(self):
+        cleaned_data = super(ReverseZoneGenerateForm, self).clean()
+        cidr = cleaned_data.get('cidr')
+        if not cidr:
+            return cleaned_data
+
+        try:
+            network = netaddr.IPNetwork(cidr)
+        except (netaddr.AddrFormatError, ValueError):
+            raise forms.ValidationError(_("Invalid network, expected a CIDR such as 192.0.2.0/24 or 2001:db8::/120."))
+
+        if dns_reverse.count_addresses(network) > dns_reverse.REVERSE_MAX_RECORDS:
+            raise forms.ValidationError(_("The network has more than %d addresses.") % dns_reverse.REVERSE_MAX_RECORDS)
+
+        # the field validator only tries an IPv4 sample, an ip6.arpa zone
+        # needs a template that also renders for IPv6 addresses
+        template = cleaned_data.get('ptrdname_template')
+        if template:
+            validate_ptrdname_template(template, str(netaddr.IPAddress(network.first + dns_reverse.address_bounds(network)[0], network.version)))
+
+        # the zone covers a contiguous prefix: checking both ends is enough
+        try:
+            zone_name = designate_bridge.get_zone(self.request, zone=cleaned_data.get('zone_id')).get('name')
+        except Exception:
+            raise forms.ValidationError(_("Unable to retrieve the reverse zone, please try again."))
+        first = netaddr.IPAddress(network.first, network.version).reverse_dns
+        last = netaddr.IPAddress(network.last, network.version).reverse_dns
+        if not (first.endswith("." + zone_name) and last.endswith("." + zone_name)):
+            raise forms.ValidationError(_("The network is not covered by reverse zone %s.") % zone_name)
+
+        cleaned_data['cidr'] = str(network.cidr)
+        return cleaned_data
+
+    def handle(self, request, data):
+        LOG.info("dns::forms::ReverseZoneGenerateForm: RUNNING POST HOOK")
+        zone_id = data.get('zone_id')
+        cidr = data.get('cidr')
+
+        try:
+            job = dns_reverse.start_job(request, zone_id, cidr, data.get('ptrdname_template'), ttl=data.get('ttl'))
+        except:
+            exceptions.handle(request, _('[DNS]: Error while submitting PTR Generation Request.'))
+            return False
+
+        if job['state'] == 'complete':
+            messages.info(request, _('[DNS]: PTR records for %s were already generated.') % cidr)
+        else:
+            messages.success(request, _('[DNS]: PTR Generation for %(cidr)s running, %(total)d addresses.') % {'cidr': cidr, 'total': job['total']})
+
+        return True
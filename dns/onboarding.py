@@ -0,0 +1,112 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+# Bulk zone onboarding: parsing and validation of the zone list, and the
+# batches of created zones whose activation is tracked together.
+
+import logging
+import re
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import ugettext_lazy as _
+from horizon.utils.validators import ValidationError
+
+from openstack_dashboard.api import designate as designate_bridge
+from openstack_dashboard.dashboards.project.dns.field_validators import validate_domain_name, validate_email_address
+
+LOG = logging.getLogger(__name__)
+
+BULK_ZONES_MAX = getattr(settings, 'DESIGNATE_BULK_ZONES_MAX', 500)
+BATCH_TTL = 24 * 3600
+FIELD_SEPARATOR_RE = re.compile(r'[\s,;]+')
+
+# parse one "name [email] [ttl]" entry per line. Every line is validated
+# before anything is submitted: returns (zones, errors), errors being a list
+# of "line N: message" strings.
+def parse_zone_lines(text, default_email=None, default_ttl=None):
+    zones = []
+    errors = []
+    seen = set()
+
+    for lineno, line in enumerate(text.splitlines(), 1):
+        fields = [f for f in FIELD_SEPARATOR_RE.split(line.strip()) if f]
+        if not fields or fields[0].startswith('#'):
+            continue
+        if len(fields) > 3:
+            errors.append(_("line %d: expected 'name [email] [ttl]'.") % lineno)
+            continue
+
+        name = fields[0]
+        email = fields[1] if len(fields) > 1 else default_email
+        ttl = fields[2] if len(fields) > 2 else default_ttl
+
+        try:
+            validate_domain_name(name)
+            validate_email_address(email or "")
+            ttl = int(ttl) if ttl not in (None, "") else None
+        except ValidationError as e:
+            errors.append(_("line %(line)d: %(error)s") % {'line': lineno, 'error': "; ".join(e.messages)})
+            continue
+        except ValueError:
+            errors.append(_("line %d: invalid TTL.") % lineno)
+            continue
+
+        if name.lower() in seen:
+            errors.append(_("line %(line)d: zone %(name)s is listed twice.") % {'line': lineno, 'name': name})
+            continue
+        seen.add(name.lower())
+        zones.append({'name': name, 'email': email, 'ttl': ttl})
+
+    if len(zones) > BULK_ZONES_MAX:
+        errors.append(_("at most %d zones can be created at once.") % BULK_ZONES_MAX)
+
+    return zones, errors
+
+def _project_id(request):
+    return getattr(request.user, 'project_id', None) or getattr(request.user, 'tenant_id', None)
+
+def _batch_key(request, batch_id):
+    return "dns_zone_batch:%s:%s" % (_project_id(request), batch_id)
+
+# remember the outcome of create_zones() so the batch can be tracked. It
+# goes to the django cache (a batch outgrows a cookie session), which must
+# be shared by all the horizon processes, see README
+def save_batch(request, outcome):
+    batch = {'id': uuid.uuid4().hex, 'zones': []}
+    for name in sorted(outcome):
+        zone, error = outcome[name]
+        batch['zones'].append({
+            'name': name,
+            'id': zone.get('id') if zone else None,
+            'status': zone.get('status') if zone else "error",
+            'action': zone.get('action') if zone else None,
+            'error': str(error) if error is not None else None,
+        })
+    cache.set(_batch_key(request, batch['id']), batch, BATCH_TTL)
+    return batch
+
+def get_batch(request, batch_id):
+    return cache.get(_batch_key(request, batch_id))
+
+# current status of every zone of the batch, from a single zone listing
+def refresh_batch(request, batch):
+    zone_ids = [zone['id'] for zone in batch['zones'] if zone['id']]
+    statuses = designate_bridge.get_zone_statuses(request, zone_ids) if zone_ids else {}
+    for zone in batch['zones']:
+        if zone['id'] in statuses:
+            zone.update(statuses[zone['id']])
+        elif zone['id']:
+            # gone from the listing: creation failed and the zone was removed
+            zone['status'] = "deleted"
+    return batch
@@ -0,0 +1,57 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+# Short-lived per-user cache of the first recordset page of a zone.
+#
+# The zones index warms it in the background when a zone link is hovered or
+# focused, and for the most recently used zones right after the page loads,
+# so that RecordSetsIndexView can usually render without calling the API.
+
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+
+from openstack_dashboard.api import designate as designate_bridge
+
+LOG = logging.getLogger(__name__)
+
+PREFETCH_TTL = getattr(settings, 'DESIGNATE_PREFETCH_TTL', 30)
+PREFETCH_RECENT_ZONES = getattr(settings, 'DESIGNATE_PREFETCH_RECENT_ZONES', 5)
+RECENT_ZONES_SESSION_KEY = 'dns_recent_zones'
+
+def _cache_key(request, zone_id):
+    project_id = getattr(request.user, 'project_id', None) or getattr(request.user, 'tenant_id', None)
+    return "dns_prefetch:%s:%s:%s" % (request.user.id, project_id, zone_id)
+
+def cached_recordsets(request, zone_id):
+    return cache.get(_cache_key(request, zone_id))
+
+def prefetch_recordsets(request, zone_id):
+    key = _cache_key(request, zone_id)
+    if cache.get(key) is not None:
+        return
+    # speculative: let the scheduler serve real page loads first
+    with designate_bridge.bulk_operation():
+        recordsets = list(designate_bridge.get_recordsets(request, zone=zone_id))
+    cache.set(key, recordsets, PREFETCH_TTL)
+
+def invalidate(request, zone_id):
+    cache.delete(_cache_key(request, zone_id))
+
+# most recently used zones of this session, newest first
+def recent_zones(request):
+    return request.session.get(RECENT_ZONES_SESSION_KEY, [])[:PREFETCH_RECENT_ZONES]
+
+def remember_zone(request, zone_id):
+    zones = [zone_id] + [z for z in recent_zones(request) if z != zone_id]
+    request.session[RECENT_ZONES_SESSION_KEY] = zones[:PREFETCH_RECENT_ZONES]
@@ -0,0 +1,170 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+# Opt-in per-request profiler for the DNS panel views.
+#
+# Admin users get a profile for a request by sending the "X-DNS-Profile: 1"
+# header, or for every request when DESIGNATE_PROFILING is True. The wall
+# time of the request is split into phases (keystone auth, designate api
+# calls, outbound throttling, DnsData construction, policy checks and
+# template rendering), returned in the X-DNS-Profile response header and
+# written to DESIGNATE_PROFILE_DIR along with a cProfile dump and a
+# collapsed-stack file that can be fed to flamegraph.pl.
+
+import collections
+import cProfile
+import json
+import logging
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+from django.conf import settings
+
+from openstack_dashboard.api import designate as designate_bridge
+
+LOG = logging.getLogger(__name__)
+
+PROFILING_ENABLED = getattr(settings, 'DESIGNATE_PROFILING', False)
+PROFILE_DIR = getattr(settings, 'DESIGNATE_PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'dns-profiles'))
+SAMPLE_INTERVAL = getattr(settings, 'DESIGNATE_PROFILE_SAMPLE_INTERVAL', 0.005)
+PROFILE_ID_RE = re.compile(r'^[\w-]+$')
+PROFILE_KINDS = {'prof': 'application/octet-stream', 'collapsed': 'text/plain', 'json': 'application/json'}
+
+# time a block of code as one of the profile phases
+phase = designate_bridge.timed_phase
+
+def profiling_requested(request):
+    if not (PROFILING_ENABLED or request.META.get('HTTP_X_DNS_PROFILE')):
+        return False
+    return getattr(request.user, 'is_superuser', False)
+
+# wall time per phase. Nested phases are exclusive: time spent in a keystone
+# call made during an api call is charged to keystone only.
+class RequestProfile(object):
+    def __init__(self, name):
+        self.name = name
+        self.id = "%s-%s-%s" % (time.strftime('%Y%m%d%H%M%S'), name, uuid.uuid4().hex[:8])
+        self.phases = collections.defaultdict(float)
+        self.total = 0.0
+        self._stack = []
+
+    def enter(self, name):
+        now = time.time()
+        if self._stack:
+            self._charge(now)
+        self._stack.append([name, now])
+
+    def exit(self):
+        now = time.time()
+        self._charge(now)
+        self._stack.pop()
+        if self._stack:
+            self._stack[-1][1] = now
+
+    def _charge(self, now):
+        name, since = self._stack[-1]
+        self.phases[name] += now - since
+        self._stack[-1][1] = now
+
+    def breakdown(self):
+        phases = dict(self.phases)
+        phases['other'] = max(self.total - sum(phases.values()), 0.0)
+        phases['total'] = self.total
+        return phases
+
+    def summary(self):
+        return "; ".join("%s=%.1fms" % (name, seconds * 1000) for name, seconds in sorted(self.breakdown().items()))
+
+# samples the stack of one thread at a fixed interval, collapsed-stack format
+class StackSampler(threading.Thread):
+    def __init__(self, thread_id, interval):
+        super(StackSampler, self).__init__()
+        self.daemon = True
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = collections.Counter()
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.is_set():
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append("%s (%s:%d)" % (code.co_name, os.path.basename(code.co_filename), code.co_firstlineno))
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+            self._stopped.wait(self.interval)
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+    def collapsed(self):
+        return "".join("%s %d\n" % (stack, count) for stack, count in self.samples.most_common())
+
+def _dump(profile, profiler, sampler):
+    if not os.path.isdir(PROFILE_DIR):
+        os.makedirs(PROFILE_DIR, 0o700)
+
+    base = os.path.join(PROFILE_DIR, profile.id)
+    profiler.dump_stats(base + '.prof')
+    with open(base + '.collapsed', 'w') as f:
+        f.write(sampler.collapsed())
+    with open(base + '.json', 'w') as f:
+        json.dump({'view': profile.name, 'phases': profile.breakdown()}, f, indent=2)
+
+def profile_path(profile_id, kind):
+    if not PROFILE_ID_RE.match(profile_id) or kind not in PROFILE_KINDS:
+        return None
+    return os.path.join(PROFILE_DIR, "%s.%s" % (profile_id, kind))
+
+class ProfiledViewMixin(object):
+    def dispatch(self, request, *args, **kwargs):
+        if not profiling_requested(request):
+            return super(ProfiledViewMixin, self).dispatch(request, *args, **kwargs)
+
+        profile = RequestProfile(self.__class__.__name__)
+        profiler = cProfile.Profile()
+        sampler = StackSampler(threading.current_thread().ident, SAMPLE_INTERVAL)
+
+        designate_bridge.attach_phase_profile(profile)
+        sampler.start()
+        began = time.time()
+        profiler.enable()
+        try:
+            response = super(ProfiledViewMixin, self).dispatch(request, *args, **kwargs)
+            # template responses render lazily, do it here to time it
+            if hasattr(response, 'render') and not getattr(response, 'is_rendered', True):
+                with phase('render'):
+                    response.render()
+        finally:
+            profiler.disable()
+            profile.total = time.time() - began
+            sampler.stop()
+            designate_bridge.detach_phase_profile()
+
+        try:
+            _dump(profile, profiler, sampler)
+            response['X-DNS-Profile-Id'] = profile.id
+        except Exception as e:
+            LOG.warning("DNS profiler: unable to write profile %s: %s" % (profile.id, e))
+
+        response['X-DNS-Profile'] = profile.summary()
+        LOG.info("DNS profiler: %s %s" % (profile.id, profile.summary()))
+        return response
@@ -0,0 +1,200 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+# Bulk PTR generation for in-addr.arpa/ip6.arpa zones.
+#
+# A job walks a CIDR one address at a time (addresses are computed from an
+# offset, the range is never materialized) and creates one PTR recordset per
+# address with at most DESIGNATE_BULK_CONCURRENCY calls in flight. Progress
+# is kept in the django cache under an id derived from the job parameters
+# (the cache must be shared by all the horizon processes, see README):
+# submitting the same zone, CIDR and template again resumes an interrupted
+# job from the lowest address not yet done, and reruns a finished job that
+# had failures (existing PTRs just come back as 409 conflicts).
+
+import hashlib
+import logging
+import threading
+import time
+from concurrent import futures
+
+import netaddr
+from django.conf import settings
+from django.core.cache import cache
+
+from openstack_dashboard.api import designate as designate_bridge
+from openstack_dashboard.dashboards.project.dns import prefetch as dns_prefetch
+from openstack_dashboard.dashboards.project.dns import snapshots as dns_snapshots
+from openstack_dashboard.dashboards.project.dns.field_validators import ptrdname_placeholders
+
+LOG = logging.getLogger(__name__)
+
+REVERSE_MAX_RECORDS = getattr(settings, 'DESIGNATE_REVERSE_MAX_RECORDS', 65536)
+JOB_TTL = 7 * 24 * 3600
+# a running job whose heartbeat is older than this is considered dead
+HEARTBEAT_TIMEOUT = 120
+SAVE_INTERVAL = 2.0
+
+# offsets of the addresses to generate: IPv4 networks larger than a /31
+# skip the network and broadcast addresses
+def address_bounds(network):
+    if network.version == 4 and network.prefixlen < 31:
+        return 1, network.size - 1
+    return 0, network.size
+
+def iter_addresses(network, start, stop):
+    offset = start
+    while offset < stop:
+        yield offset, netaddr.IPAddress(network.first + offset, network.version)
+        offset += 1
+
+def count_addresses(network):
+    start, stop = address_bounds(network)
+    return stop - start
+
+def _project_id(request):
+    return getattr(request.user, 'project_id', None) or getattr(request.user, 'tenant_id', None)
+
+def _job_key(request, job_id):
+    return "dns_reverse_job:%s:%s" % (_project_id(request), job_id)
+
+# held while a job runs, so that concurrent submits start a single run
+def _lock_key(request, job_id):
+    return "dns_reverse_lock:%s:%s" % (_project_id(request), job_id)
+
+def _zone_jobs_key(request, zone_id):
+    return "dns_reverse_jobs:%s:%s" % (_project_id(request), zone_id)
+
+def job_id(request, zone_id, cidr, template):
+    return hashlib.sha1(("%s|%s|%s|%s" % (_project_id(request), zone_id, cidr, template)).encode('utf-8')).hexdigest()[:16]
+
+def get_job(request, job_id):
+    return cache.get(_job_key(request, job_id))
+
+def get_zone_jobs(request, zone_id):
+    jobs = [get_job(request, job_id) for job_id in cache.get(_zone_jobs_key(request, zone_id), [])]
+    return [job for job in jobs if job is not None]
+
+def _save(request, job):
+    job['heartbeat'] = time.time()
+    cache.set(_job_key(request, job['id']), job, JOB_TTL)
+    if job['state'] == 'running':
+        cache.set(_lock_key(request, job['id']), True, HEARTBEAT_TIMEOUT)
+
+def is_running(job):
+    return job['state'] == 'running' and time.time() - job['heartbeat'] < HEARTBEAT_TIMEOUT
+
+# start a new job, or resume the interrupted one with the same parameters.
+# Returns the job, its state tells whether it was (re)started.
+def start_job(request, zone_id, cidr, template, ttl=None):
+    network = netaddr.IPNetwork(cidr)
+    new_job_id = job_id(request, zone_id, str(network.cidr), template)
+    job = get_job(request, new_job_id)
+    if job is not None and (is_running(job) or (job['state'] == 'complete' and not job['failed'])):
+        return job
+
+    if job is not None and job['state'] == 'complete':
+        # failed addresses are not recorded one by one: walk the range again
+        job.update({'cursor': address_bounds(network)[0], 'created': 0, 'existing': 0, 'failed': 0, 'errors': []})
+
+    is_new = job is None
+    if is_new:
+        start, stop = address_bounds(network)
+        job = {
+            'id': new_job_id,
+            'zone_id': zone_id,
+            'cidr': str(network.cidr),
+            'template': template,
+            'ttl': ttl,
+            'total': stop - start,
+            'cursor': start,
+            'created': 0,
+            'existing': 0,
+            'failed': 0,
+            'errors': [],
+        }
+
+    # cache.add is atomic: only one of several concurrent submits gets to
+    # run the job, the others report the run already in progress
+    if not cache.add(_lock_key(request, job['id']), True, HEARTBEAT_TIMEOUT):
+        return dict(get_job(request, job['id']) or job, state='running')
+
+    if is_new:
+        zone_jobs = cache.get(_zone_jobs_key(request, zone_id), [])
+        if job['id'] not in zone_jobs:
+            cache.set(_zone_jobs_key(request, zone_id), zone_jobs + [job['id']], JOB_TTL)
+
+    job['state'] = 'running'
+    _save(request, job)
+
+    thread = threading.Thread(target=_run, args=(request, job))
+    thread.daemon = True
+    thread.start()
+    return job
+
+def _create_ptr(request, zone_id, address, template, ttl):
+    ptrdname = template.format(**ptrdname_placeholders(str(address)))
+    with designate_bridge.bulk_operation():
+        designate_bridge.create_recordset(request, zone=zone_id, name=address.reverse_dns, type_='PTR', records=[ptrdname], ttl=ttl)
+
+def _run(request, job):
+    network = netaddr.IPNetwork(job['cidr'])
+    addresses = iter_addresses(network, job['cursor'], address_bounds(network)[1])
+    in_flight = {}
+    next_offset = job['cursor']
+    exhausted = False
+    last_save = time.time()
+
+    executor = futures.ThreadPoolExecutor(max_workers=designate_bridge.BULK_CONCURRENCY)
+    try:
+        while True:
+            # keep the pool full without reading ahead of it
+            while not exhausted and len(in_flight) < designate_bridge.BULK_CONCURRENCY:
+                try:
+                    offset, address = next(addresses)
+                except StopIteration:
+                    exhausted = True
+                    break
+                in_flight[executor.submit(_create_ptr, request, job['zone_id'], address, job['template'], job['ttl'])] = offset
+                next_offset = offset + 1
+
+            if not in_flight:
+                break
+
+            done, _pending = futures.wait(in_flight, return_when=futures.FIRST_COMPLETED)
+            for future in done:
+                offset = in_flight.pop(future)
+                error = future.exception()
+                if error is None:
+                    job['created'] += 1
+                elif getattr(error, 'code', None) == 409:
+                    job['existing'] += 1
+                else:
+                    job['failed'] += 1
+                    job['errors'] = (job['errors'] + ["%s: %s" % (netaddr.IPAddress(network.first + offset, network.version), error)])[-10:]
+
+            # everything below the lowest address still in flight is done
+            job['cursor'] = min(in_flight.values()) if in_flight else next_offset
+            if time.time() - last_save > SAVE_INTERVAL:
+                _save(request, job)
+                last_save = time.time()
+
+        job['state'] = 'complete'
+    except Exception as e:
+        LOG.error("Reverse zone job %s stopped: %s" % (job['id'], e))
+        job['state'] = 'interrupted'
+    finally:
+        executor.shutdown(wait=True)
+        _save(request, job)
+        cache.delete(_lock_key(request, job['id']))
+        dns_snapshots.invalidate(request, zone_id=job['zone_id'])
+        dns_prefetch.invalidate(request, job['zone_id'])
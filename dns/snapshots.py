@@ -0,0 +1,191 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+# Optional on-disk warm-start store for zone and recordset listings.
+#
+# Enabled by pointing DESIGNATE_SNAPSHOT_PATH to a sqlite file writable by
+# the web server. Every live listing is written through to the store. The
+# first time a process serves a listing (i.e. after an apache restart) it
+# renders from the snapshot and revalidates it in the background: the zone
+# list is fetched again and only zones whose serial changed get their
+# recordsets re-fetched. Later loads in the same process go to the API.
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+from django.conf import settings
+
+from openstack_dashboard.api import designate as designate_bridge
+
+LOG = logging.getLogger(__name__)
+
+SNAPSHOT_PATH = getattr(settings, 'DESIGNATE_SNAPSHOT_PATH', None)
+
+class SnapshotStore(object):
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS zones (project_id TEXT PRIMARY KEY, payload TEXT NOT NULL, updated REAL NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS recordsets (project_id TEXT NOT NULL, zone_id TEXT NOT NULL, serial INTEGER, "
+        "payload TEXT NOT NULL, updated REAL NOT NULL, PRIMARY KEY (project_id, zone_id))",
+    )
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._ready = False
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        if not self._ready:
+            with self._lock:
+                for statement in self.SCHEMA:
+                    conn.execute(statement)
+                conn.commit()
+                self._ready = True
+        return conn
+
+    def _execute(self, query, args=()):
+        conn = self._connect()
+        try:
+            with conn:
+                return conn.execute(query, args).fetchall()
+        finally:
+            conn.close()
+
+    def load_zones(self, project_id):
+        rows = self._execute("SELECT payload FROM zones WHERE project_id = ?", (project_id,))
+        return json.loads(rows[0][0]) if rows else None
+
+    def save_zones(self, project_id, zones):
+        self._execute("INSERT OR REPLACE INTO zones (project_id, payload, updated) VALUES (?, ?, ?)",
+                      (project_id, json.dumps(zones, default=str), time.time()))
+
+    def drop_zones(self, project_id):
+        self._execute("DELETE FROM zones WHERE project_id = ?", (project_id,))
+
+    def load_recordsets(self, project_id, zone_id):
+        rows = self._execute("SELECT serial, payload FROM recordsets WHERE project_id = ? AND zone_id = ?", (project_id, zone_id))
+        if not rows:
+            return None, None
+        return rows[0][0], json.loads(rows[0][1])
+
+    def save_recordsets(self, project_id, zone_id, serial, recordsets):
+        self._execute("INSERT OR REPLACE INTO recordsets (project_id, zone_id, serial, payload, updated) VALUES (?, ?, ?, ?, ?)",
+                      (project_id, zone_id, serial, json.dumps(recordsets, default=str), time.time()))
+
+    def drop_recordsets(self, project_id, zone_id):
+        self._execute("DELETE FROM recordsets WHERE project_id = ? AND zone_id = ?", (project_id, zone_id))
+
+    def recordset_serials(self, project_id):
+        return dict(self._execute("SELECT zone_id, serial FROM recordsets WHERE project_id = ?", (project_id,)))
+
+_STORE = SnapshotStore(SNAPSHOT_PATH) if SNAPSHOT_PATH else None
+
+# listings already served (and revalidated) by this process
+_WARM = set()
+_WARM_LOCK = threading.Lock()
+
+def _claim_cold(key):
+    with _WARM_LOCK:
+        if key in _WARM:
+            return False
+        _WARM.add(key)
+        return True
+
+def _project_id(request):
+    return getattr(request.user, 'project_id', None) or getattr(request.user, 'tenant_id', None)
+
+# revalidation is not needed by the page being served: it runs at bulk
+# priority so that the scheduler serves page loads first
+def _in_background(target, *args):
+    def run():
+        try:
+            with designate_bridge.bulk_operation():
+                target(*args)
+        except Exception as e:
+            LOG.warning("DNS snapshot revalidation failed: %s" % e)
+
+    thread = threading.Thread(target=run)
+    thread.daemon = True
+    thread.start()
+
+def _zone_serial(project_id, zone_id):
+    for zone in _STORE.load_zones(project_id) or []:
+        if zone.get('id') == zone_id:
+            return zone.get('serial')
+    return None
+
+def _revalidate_zones(request, project_id):
+    zones = list(designate_bridge.get_zones(request))
+    _STORE.save_zones(project_id, zones)
+
+    serials = dict((zone.get('id'), zone.get('serial')) for zone in zones)
+    for zone_id, snapshot_serial in _STORE.recordset_serials(project_id).items():
+        if zone_id not in serials:
+            _STORE.drop_recordsets(project_id, zone_id)
+        elif serials[zone_id] != snapshot_serial:
+            recordsets = list(designate_bridge.get_recordsets(request, zone=zone_id))
+            _STORE.save_recordsets(project_id, zone_id, serials[zone_id], recordsets)
+
+def _revalidate_recordsets(request, project_id, zone_id, snapshot_serial):
+    serial = designate_bridge.get_zone(request, zone=zone_id).get('serial')
+    if serial != snapshot_serial:
+        recordsets = list(designate_bridge.get_recordsets(request, zone=zone_id))
+        _STORE.save_recordsets(project_id, zone_id, serial, recordsets)
+
+def get_zones(request):
+    if _STORE is None:
+        return designate_bridge.get_zones(request)
+
+    project_id = _project_id(request)
+    if _claim_cold(('zones', project_id)):
+        snapshot = _STORE.load_zones(project_id)
+        if snapshot is not None:
+            _in_background(_revalidate_zones, request, project_id)
+            return snapshot
+
+    zones = list(designate_bridge.get_zones(request))
+    _STORE.save_zones(project_id, zones)
+    return zones
+
+def get_recordsets(request, zone_id):
+    if _STORE is None:
+        return designate_bridge.get_recordsets(request, zone=zone_id)
+
+    project_id = _project_id(request)
+    if _claim_cold(('recordsets', project_id, zone_id)):
+        serial, snapshot = _STORE.load_recordsets(project_id, zone_id)
+        if snapshot is not None:
+            _in_background(_revalidate_recordsets, request, project_id, zone_id, serial)
+            return snapshot
+
+    recordsets = list(designate_bridge.get_recordsets(request, zone=zone_id))
+    # the serial of the last zone listing is good enough: when it is older
+    # than the recordsets, revalidation just re-fetches them once more
+    _STORE.save_recordsets(project_id, zone_id, _zone_serial(project_id, zone_id), recordsets)
+    return recordsets
+
+# drop snapshots made stale by a write from this dashboard
+def invalidate(request, zone_id=None):
+    if _STORE is None:
+        return
+
+    project_id = _project_id(request)
+    try:
+        if zone_id is None:
+            _STORE.drop_zones(project_id)
+        else:
+            _STORE.drop_recordsets(project_id, zone_id)
+    except Exception as e:
+        LOG.warning("DNS snapshot invalidation failed: %s" % e)
@@ -21,6 +21,9 @@ from django.core.urlresolvers import reverse,reverse_lazy, NoReverseMatch
 from horizon import tables,exceptions,messages
 from openstack_dashboard.api import designate as designate_bridge
 from openstack_dashboard import policy
+from openstack_dashboard.dashboards.project.dns import prefetch as dns_prefetch
+from openstack_dashboard.dashboards.project.dns import profiling as dns_profiling
+from openstack_dashboard.dashboards.project.dns import snapshots as dns_snapshots
 
 # policy engine support
 # make sure a "domain_admin" role is created in openstack keystone
@@ -41,15 +44,21 @@ DESIGNATE_POLICY_ATOMS = {
             'get_recordsets': ("dns", "get_recordsets"),
             'find_recordset': ("dns", "find_recordsets"),
             'find_recordsets': ("dns", "find_recordsets"),
+            'get_floatingip': ("dns", "get_floatingip"),
+            'list_floatingips': ("dns", "list_floatingips"),
+            'update_floatingip': ("dns", "update_floatingip"),
         }
 
 DNS_POLICIES = {
             'zone_create': (DESIGNATE_POLICY_ATOMS['zone_create'], DESIGNATE_POLICY_ATOMS['get_zones'], DESIGNATE_POLICY_ATOMS['find_zones'],),
             'zone_update': (DESIGNATE_POLICY_ATOMS['get_zone'], DESIGNATE_POLICY_ATOMS['find_zone'], DESIGNATE_POLICY_ATOMS['zone_update'],),
+            'zone_get': (DESIGNATE_POLICY_ATOMS['get_zone'], DESIGNATE_POLICY_ATOMS['find_zone'],),
             'zone_delete': (DESIGNATE_POLICY_ATOMS['get_zone'], DESIGNATE_POLICY_ATOMS['find_zone'], DESIGNATE_POLICY_ATOMS['zone_delete'],),
             'recordset_create': (DESIGNATE_POLICY_ATOMS['get_recordsets'], DESIGNATE_POLICY_ATOMS['find_recordsets'], DESIGNATE_POLICY_ATOMS['recordset_create']),
             'recordset_update': (DESIGNATE_POLICY_ATOMS['get_recordset'], DESIGNATE_POLICY_ATOMS['find_recordset'], DESIGNATE_POLICY_ATOMS['recordset_update']),
             'recordset_delete': (DESIGNATE_POLICY_ATOMS['get_recordsets'], DESIGNATE_POLICY_ATOMS['find_recordsets'], DESIGNATE_POLICY_ATOMS['recordset_delete']),
+            'floatingip_list': (DESIGNATE_POLICY_ATOMS['list_floatingips'],),
+            'floatingip_update': (DESIGNATE_POLICY_ATOMS['get_floatingip'], DESIGNATE_POLICY_ATOMS['update_floatingip'],),
         }
 
 LOG = logging.getLogger(__name__)
@@ -74,10 +83,25 @@ class ZoneCreateLink(tables.LinkAction):
     icon = "plus"
 
     def allowed(self, request, datum):
-        outcome = policy.check(DNS_POLICIES['zone_create'], request)
+        with dns_profiling.phase('policy'):
+            outcome = policy.check(DNS_POLICIES['zone_create'], request)
         LOG.info("POLICY %s (type %s) CHECK ZONE CREATE %s" % (DNS_POLICIES['zone_create'], type(DNS_POLICIES['zone_create']), outcome))
         return outcome
 
+# bulk zone create button link handler
+class ZoneBulkCreateLink(tables.LinkAction):
+    name = "zonebulkcreate"
+    verbose_name = _("Add DNS Zones in Bulk")
+    url = "horizon:project:dns:zonebulkcreate"
+    classes = ("ajax-modal",)
+    icon = "plus"
+
+    def allowed(self, request, datum):
+        with dns_profiling.phase('policy'):
+            outcome = policy.check(DNS_POLICIES['zone_create'], request)
+        LOG.info("POLICY CHECK ZONE BULK CREATE %s" % outcome)
+        return outcome
+
 # zone update link handler
 class ZoneUpdateLink(tables.LinkAction):
     name = "zoneupdate"
@@ -87,10 +111,23 @@ class ZoneUpdateLink(tables.LinkAction):
     icon = "pencil"
 
     def allowed(self, request, datum):
-        outcome = policy.check(DNS_POLICIES['zone_update'], request)
+        with dns_profiling.phase('policy'):
+            outcome = policy.check(DNS_POLICIES['zone_update'], request)
         LOG.info("POLICY %s (type %s) CHECK ZONE UPDATE %s" % (DNS_POLICIES['zone_update'], type(DNS_POLICIES['zone_update']), outcome))
         return outcome
 
+# zone detail link handler
+class ZoneDetailLink(tables.LinkAction):
+    name = "zonedetail"
+    verbose_name = _("View DNS Zone Details")
+    url = "horizon:project:dns:zonedetail"
+    icon = "eye"
+
+    def allowed(self, request, datum):
+        with dns_profiling.phase('policy'):
+            outcome = policy.check(DNS_POLICIES['zone_get'], request)
+        LOG.info("POLICY CHECK ZONE DETAIL %s" % outcome)
+        return outcome
 
 # zone delete button link handler
 class ZoneDeleteLink(tables.DeleteAction):
@@ -114,12 +151,14 @@ class ZoneDeleteLink(tables.DeleteAction):
         )
 
     def allowed(self, request, datum):
-       outcome = policy.check(DNS_POLICIES['zone_delete'], request)
+       with dns_profiling.phase('policy'):
+           outcome = policy.check(DNS_POLICIES['zone_delete'], request)
        LOG.info("POLICY CHECK ZONE DELETE %s" % outcome)
        return outcome
 
     def delete(self, request, obj_id):
         designate_bridge.delete_zone(request, obj_id)
+        dns_snapshots.invalidate(request)
 
 class UpdateZoneRow(tables.Row):
     ajax = True
@@ -137,8 +176,9 @@ class UpdateZoneRow(tables.Row):
 
         if zone_instance is not None:
             zone_object = DnsData(**zone_instance)
+            zone_object.region = designate_bridge.zone_region(request, zone_id) or getattr(request.user, 'services_region', None)
         else:
-            zone_object = DnsData(**{'id': None, 'name': None, 'email': None, 'status': "deleted", 'action': None, 'ttl': None, 'serial': None, 'description': None})
+            zone_object = DnsData(**{'id': None, 'name': None, 'email': None, 'status': "deleted", 'action': None, 'ttl': None, 'serial': None, 'description': None, 'region': None})
 
         return zone_object
 
@@ -175,7 +215,8 @@ class RecordSetCreateLink(tables.LinkAction):
     icon = "plus"
 
     def allowed(self, request, datum):
-       outcome = policy.check(DNS_POLICIES['recordset_create'], request)
+       with dns_profiling.phase('policy'):
+           outcome = policy.check(DNS_POLICIES['recordset_create'], request)
        LOG.info("POLICY CHECK RECORDSET CREATE %s" % outcome)
        return outcome
 
@@ -187,7 +228,6 @@ class RecordSetUpdateLink(tables.LinkAction):
     cancel_url = "horizon:project:dns:recordsets"
     classes = ("ajax-modal",)
     icon = "pencil"
-    policy_rules = DNS_POLICIES['recordset_update']
 
     def get_link_url(self, datum=None):
         if not self.url:
@@ -211,15 +251,33 @@ class RecordSetUpdateLink(tables.LinkAction):
     def allowed(self, request, datum):
         if (datum is not None) and (datum.type in ALLOWED_RECORD_TYPES):
             self.datum = datum
-            return True
+            # checked here rather than through policy_rules, so it is timed
+            with dns_profiling.phase('policy'):
+                return policy.check(DNS_POLICIES['recordset_update'], request)
         else:
             LOG.info("RecordSetUpdateLink: Update call is not permitted by API")
             return False
 
+# reverse zone PTR generator link handler
+class ReverseZoneGenerateLink(tables.LinkAction):
+    name = "reversegenerate"
+    verbose_name = _("Generate PTR Records")
+    url = "horizon:project:dns:reversegenerate"
+    classes = ("ajax-modal",)
+    icon = "plus"
+
+    def get_link_url(self, datum=None):
+        return reverse(self.url, args=(self.table.kwargs.get('zone_id'),))
+
+    def allowed(self, request, datum):
+        with dns_profiling.phase('policy'):
+            outcome = policy.check(DNS_POLICIES['recordset_create'], request)
+        LOG.info("POLICY CHECK REVERSE GENERATE %s" % outcome)
+        return outcome
+
 # record delete button link handler
 class RecordSetDeleteLink(tables.DeleteAction):
     name = "recordsetdelete"
-    policy_rules = DNS_POLICIES['recordset_delete']
 
     @staticmethod
     def action_present(count):
@@ -240,13 +298,119 @@ class RecordSetDeleteLink(tables.DeleteAction):
     def allowed(self, request, datum):
         if (datum is not None) and (datum.type in ALLOWED_RECORD_TYPES):
             self.datum=datum
-            return True
+            # checked here rather than through policy_rules, so it is timed
+            with dns_profiling.phase('policy'):
+                return policy.check(DNS_POLICIES['recordset_delete'], request)
         else:
             LOG.info("RecordSetDeleteLink: Delete call is not permitted by API")
             return False
 
     def delete(self, request, obj_id):
         designate_bridge.delete_recordset(request, zone=self.datum.zone_id, recordset=obj_id)
+        dns_snapshots.invalidate(request, zone_id=self.datum.zone_id)
+        dns_prefetch.invalidate(request, self.datum.zone_id)
+
+# floating ip PTR overview link handler
+class FloatingIpPtrIndexLink(tables.LinkAction):
+    name = "floatingipptrs"
+    verbose_name = _("Floating IP PTR Records")
+    url = "horizon:project:dns:floatingipptrs"
+    icon = "list"
+
+    def allowed(self, request, datum):
+        with dns_profiling.phase('policy'):
+            outcome = policy.check(DNS_POLICIES['floatingip_list'], request)
+        LOG.info("POLICY CHECK FLOATINGIP LIST %s" % outcome)
+        return outcome
+
+# floating ip PTR set link handler
+class FloatingIpPtrSetLink(tables.LinkAction):
+    name = "floatingipptrset"
+    verbose_name = _("Set PTR Record")
+    url = "horizon:project:dns:floatingipptrset"
+    classes = ("ajax-modal",)
+    icon = "pencil"
+
+    def allowed(self, request, datum):
+        with dns_profiling.phase('policy'):
+            outcome = policy.check(DNS_POLICIES['floatingip_update'], request)
+        LOG.info("POLICY CHECK FLOATINGIP PTR SET %s" % outcome)
+        return outcome
+
+# floating ip PTR bulk set link handler
+class FloatingIpPtrBulkSetLink(tables.LinkAction):
+    name = "floatingipptrbulkset"
+    verbose_name = _("Set PTR Records in Bulk")
+    url = "horizon:project:dns:floatingipptrbulkset"
+    classes = ("ajax-modal",)
+    icon = "plus"
+
+    def allowed(self, request, datum):
+        with dns_profiling.phase('policy'):
+            outcome = policy.check(DNS_POLICIES['floatingip_update'], request)
+        LOG.info("POLICY CHECK FLOATINGIP PTR BULK SET %s" % outcome)
+        return outcome
+
+# floating ip PTR unset button link handler
+class FloatingIpPtrUnsetLink(tables.DeleteAction):
+    name = "floatingipptrunset"
+    success_url = reverse_lazy("horizon:project:dns:floatingipptrs")
+
+    @staticmethod
+    def action_present(count):
+        return ungettext_lazy(
+            u"Unset PTR Record",
+            u"Unset PTR Records",
+            count
+        )
+
+    @staticmethod
+    def action_past(count):
+        return ungettext_lazy(
+            u"PTR Record Unset Accepted",
+            u"PTR Records Unset Accepted",
+            count
+        )
+
+    def allowed(self, request, datum):
+        if (datum is not None) and not datum.ptrdname:
+            return False
+        with dns_profiling.phase('policy'):
+            outcome = policy.check(DNS_POLICIES['floatingip_update'], request)
+        LOG.info("POLICY CHECK FLOATINGIP PTR UNSET %s" % outcome)
+        return outcome
+
+    def delete(self, request, obj_id):
+        designate_bridge.unset_floatingip_ptr(request, obj_id)
+
+class FloatingIpPtrTable(tables.DataTable):
+    STATUS_CHOICES = (
+        ("active", True),
+        ("pending", None),
+        ("error", False),
+    )
+    ACTION_CHOICES = (
+        ("create", None),
+        ("update", None),
+        ("delete", None),
+        ("none", True),
+        ("error", False),
+    )
+    id = tables.Column('id', verbose_name=_('ID'), hidden=True)
+    address = tables.Column('address', verbose_name=_('Floating IP Address'))
+    fixed_ip = tables.Column('fixed_ip', verbose_name=_('Mapped Fixed IP Address'))
+    ptrdname = tables.Column('ptrdname', verbose_name=_('PTR Record'))
+    ttl = tables.Column('ttl', verbose_name=_('TTL'))
+    description = tables.Column('description', verbose_name=_('Description'))
+    status = tables.Column('status', verbose_name=_('Health'), status=True, status_choices=STATUS_CHOICES)
+    action = tables.Column('action', verbose_name=_('Current Action'), status=True, status_choices=ACTION_CHOICES)
+
+    class Meta(object):
+        name = 'floatingipptrs'
+        verbose_name = _('Floating IP PTR Records')
+        status_columns = ['status', 'action']
+        table_actions = (FloatingIpPtrBulkSetLink, FloatingIpPtrUnsetLink, )
+        row_actions = (FloatingIpPtrSetLink, FloatingIpPtrUnsetLink, )
 
 class DNSRecordSetTable(tables.DataTable):
     STATUS_CHOICES = (
@@ -277,6 +441,7 @@ class DNSRecordSetTable(tables.DataTable):
         row_class = UpdateRecordRow
         status_columns = ['status', 'action']
         row_class = UpdateRecordRow
+        table_actions = (ReverseZoneGenerateLink, )
         row_actions = (RecordSetUpdateLink, RecordSetDeleteLink, )
 
 class DNSZonesTable(tables.DataTable):
@@ -294,13 +459,14 @@ class DNSZonesTable(tables.DataTable):
         ("error", False),
     )
     id = tables.Column('id', verbose_name=_('ID'), hidden=True)
-    name = tables.Column('name', link='horizon:project:dns:recordsets', verbose_name=_('DNS Zone Name'))
+    name = tables.Column('name', link='horizon:project:dns:recordsets', link_attrs={'data-dns-prefetch': 'recordsets'}, verbose_name=_('DNS Zone Name'))
     email = tables.Column('email', verbose_name=_('Registrar E-Mail Address'))
     status = tables.Column('status', verbose_name=_('Zone Health'), status=True, status_choices=STATUS_CHOICES)
     action = tables.Column('action', verbose_name=_('Current Action'), status=True, status_choices=ACTION_CHOICES)
     ttl = tables.Column('ttl', verbose_name=_('Zone TTL'))
     type = tables.Column('type', verbose_name=_('Zone Type'))
     serial = tables.Column('serial', verbose_name=_('Zone Serial'))
+    region = tables.Column('region', verbose_name=_('Region'))
     description = tables.Column('description', verbose_name=_('Description'))
 
     class Meta(object):
@@ -308,5 +474,41 @@ class DNSZonesTable(tables.DataTable):
         verbose_name = _("DNS as a Service: Zones")
         status_columns = ["status", "action"]
         row_class = UpdateZoneRow
-        table_actions = (ZoneCreateLink, ZoneDeleteLink, )
-        row_actions = (ZoneUpdateLink, RecordSetCreateLink, ZoneDeleteLink,)
+        table_actions = (ZoneCreateLink, ZoneBulkCreateLink, FloatingIpPtrIndexLink, ZoneDeleteLink, )
+        row_actions = (ZoneDetailLink, ZoneUpdateLink, RecordSetCreateLink, ZoneDeleteLink,)
+
+# zone detail tabs
+class ZoneNameServersTable(tables.DataTable):
+    hostname = tables.Column('hostname', verbose_name=_('Name Server'))
+    priority = tables.Column('priority', verbose_name=_('Priority'))
+
+    def get_object_id(self, datum):
+        return datum.hostname
+
+    class Meta(object):
+        name = 'nameservers'
+        verbose_name = _('Name Servers')
+
+class ZoneRecordTypesTable(tables.DataTable):
+    type = tables.Column('type', verbose_name=_('Record Type'))
+    recordsets = tables.Column('recordsets', verbose_name=_('Record Sets'))
+    records = tables.Column('records', verbose_name=_('Records'))
+
+    def get_object_id(self, datum):
+        return datum.type
+
+    class Meta(object):
+        name = 'recordtypes'
+        verbose_name = _('Record Sets by Type')
+
+class ZonePendingRecordSetsTable(tables.DataTable):
+    id = tables.Column('id', verbose_name=_('ID'), hidden=True)
+    name = tables.Column('name', verbose_name=_('FQDN'))
+    type = tables.Column('type', verbose_name=_('Record Type'))
+    record_data = tables.Column('record_data', verbose_name=_('Records'))
+    action = tables.Column('action', verbose_name=_('Current Action'))
+    updated_at = tables.Column('updated_at', verbose_name=_('Last Update'))
+
+    class Meta(object):
+        name = 'pending'
+        verbose_name = _('Pending Operations')
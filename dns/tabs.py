@@ -0,0 +1,120 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+# Zone detail tabs.
+#
+# No tab is preloaded: the tab being shown is rendered with the page and
+# the others are fetched over ajax the first time they are opened, so a
+# request only makes the designate calls of the tab it renders. Calls
+# shared between tabs (the zone, its recordsets) are memoized on the tab
+# group, which lives for one request.
+
+import collections
+import logging
+
+from django.utils.translation import ugettext_lazy as _
+from horizon import exceptions
+from horizon import tabs
+from horizon.utils import memoized
+
+from openstack_dashboard.api import designate as designate_bridge
+from openstack_dashboard.dashboards.project.dns import profiling as dns_profiling
+from openstack_dashboard.dashboards.project.dns import tables as dns_tables
+
+LOG = logging.getLogger(__name__)
+
+class OverviewTab(tabs.Tab):
+    name = _("Overview")
+    slug = "overview"
+    template_name = "project/dns/_zonedetail_overview.html"
+    preload = False
+
+    def get_context_data(self, request):
+        return {'zone': self.tab_group.get_zone(), 'region': self.tab_group.get_region()}
+
+class NameServersTab(tabs.TableTab):
+    name = _("Name Servers")
+    slug = "nameservers"
+    table_classes = (dns_tables.ZoneNameServersTable,)
+    template_name = "horizon/common/_detail_table.html"
+    preload = False
+
+    def get_nameservers_data(self):
+        try:
+            nameservers = designate_bridge.get_zone_nameservers(self.request, self.tab_group.kwargs['zone_id'])
+        except Exception:
+            nameservers = []
+            exceptions.handle(self.request, _('Unable to retrieve the name servers of the zone.'))
+
+        with dns_profiling.phase('dnsdata'):
+            return [dns_tables.DnsData(**nameserver) for nameserver in nameservers]
+
+class RecordTypesTab(tabs.TableTab):
+    name = _("Record Types")
+    slug = "recordtypes"
+    table_classes = (dns_tables.ZoneRecordTypesTable,)
+    template_name = "horizon/common/_detail_table.html"
+    preload = False
+
+    def get_recordtypes_data(self):
+        recordsets = collections.Counter()
+        records = collections.Counter()
+        for recordset in self.tab_group.get_recordsets():
+            recordsets[recordset['type']] += 1
+            records[recordset['type']] += len(recordset.get('records') or [])
+
+        with dns_profiling.phase('dnsdata'):
+            return [dns_tables.DnsData(type=type_, recordsets=recordsets[type_], records=records[type_])
+                    for type_ in sorted(recordsets)]
+
+class PendingTab(tabs.TableTab):
+    name = _("Pending Operations")
+    slug = "pending"
+    table_classes = (dns_tables.ZonePendingRecordSetsTable,)
+    template_name = "horizon/common/_detail_table.html"
+    preload = False
+
+    def get_pending_data(self):
+        try:
+            recordsets = designate_bridge.get_pending_recordsets(self.request, self.tab_group.kwargs['zone_id'])
+        except Exception:
+            recordsets = []
+            exceptions.handle(self.request, _('Unable to retrieve the pending operations of the zone.'))
+
+        with dns_profiling.phase('dnsdata'):
+            return [dns_tables.DnsData(**recordset) for recordset in recordsets]
+
+class ZoneDetailTabs(tabs.TabGroup):
+    slug = "zone_detail"
+    tabs = (OverviewTab, NameServersTab, RecordTypesTab, PendingTab,)
+    sticky = True
+
+    @memoized.memoized_method
+    def get_zone(self):
+        try:
+            return designate_bridge.get_zone(self.request, self.kwargs['zone_id'])
+        except Exception:
+            exceptions.handle(self.request, _('Unable to retrieve zone details.'))
+            return None
+
+    @memoized.memoized_method
+    def get_region(self):
+        return designate_bridge.zone_region(self.request, self.kwargs['zone_id']) or getattr(self.request.user, 'services_region', None)
+
+    # every page: the prefetch cache only holds the first one
+    @memoized.memoized_method
+    def get_recordsets(self):
+        try:
+            return list(designate_bridge.get_all_recordsets(self.request, self.kwargs['zone_id']))
+        except Exception:
+            exceptions.handle(self.request, _('Unable to retrieve the record sets of the zone.'))
+            return []
@@ -18,8 +18,19 @@ urlpatterns = [
     url(r'^$', views.IndexView.as_view(), name='index'),
     url(r'^index$', views.IndexView.as_view(), name='index'),
     url(r'^zones/create$', views.ZoneCreateView.as_view(), name='zonecreate'),
+    url(r'^zones/bulkcreate$', views.BulkZoneCreateView.as_view(), name='zonebulkcreate'),
+    url(r'^zones/batch/(?P<batch_id>[0-9a-f]+)$', views.BulkZoneBatchView.as_view(), name='zonebatch'),
+    url(r'^zones/batch/(?P<batch_id>[0-9a-f]+)/status$', views.BulkZoneBatchStatusView.as_view(), name='zonebatchstatus'),
+    url(r'^zones/(?P<zone_id>[^/]+)/detail$', views.ZoneDetailView.as_view(), name='zonedetail'),
     url(r'^zones/(?P<zone_id>[^/]+)/update$', views.ZoneUpdateView.as_view(), name='zoneupdate'),
     url(r'^zones/(?P<zone_id>[^/]+)/index$', views.RecordSetsIndexView.as_view(), name='recordsets'),
+    url(r'^zones/(?P<zone_id>[^/]+)/prefetch$', views.RecordSetPrefetchView.as_view(), name='recordsetprefetch'),
     url(r'^zones/(?P<zone_id>[^/]+)/create$', views.RecordSetCreateView.as_view(), name='recordsetcreate'),
+    url(r'^zones/(?P<zone_id>[^/]+)/reverse/generate$', views.ReverseZoneGenerateView.as_view(), name='reversegenerate'),
+    url(r'^zones/(?P<zone_id>[^/]+)/reverse/(?P<job_id>[0-9a-f]+)/progress$', views.ReverseJobProgressView.as_view(), name='reverseprogress'),
     url(r'^zones/(?P<zone_id>[^/]+)/recordset/(?P<recordset_id>[^/]+)/update$', views.RecordSetUpdateView.as_view(), name='recordsetupdate'),
+    url(r'^reverse/floatingips$', views.FloatingIpPtrIndexView.as_view(), name='floatingipptrs'),
+    url(r'^reverse/floatingips/bulkset$', views.FloatingIpPtrBulkSetView.as_view(), name='floatingipptrbulkset'),
+    url(r'^reverse/floatingips/(?P<floatingip_id>[^/]+)/set$', views.FloatingIpPtrSetView.as_view(), name='floatingipptrset'),
+    url(r'^profiles/(?P<profile_id>[\w-]+)\.(?P<kind>prof|collapsed|json)$', views.ProfileDownloadView.as_view(), name='profile'),
 ]
@@ -10,19 +10,33 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import json
 import logging
+import os
 
 from django.core.urlresolvers import reverse,reverse_lazy, NoReverseMatch
+from django.http import Http404, HttpResponse
 from django.shortcuts import redirect
+from django.views import generic
 from django.utils.translation import ugettext_lazy as _
 from horizon import exceptions
 from horizon import forms
+from horizon import messages
 from horizon import tables
+from horizon import tabs
+from horizon import views
 
 from openstack_dashboard import settings
 from openstack_dashboard.api import designate
 from openstack_dashboard.dashboards.project.dns import tables as dns_tables
 from openstack_dashboard.dashboards.project.dns import forms as dns_forms
+from openstack_dashboard.dashboards.project.dns import floatingips as dns_floatingips
+from openstack_dashboard.dashboards.project.dns import onboarding as dns_onboarding
+from openstack_dashboard.dashboards.project.dns import snapshots as dns_snapshots
+from openstack_dashboard.dashboards.project.dns import profiling as dns_profiling
+from openstack_dashboard.dashboards.project.dns import prefetch as dns_prefetch
+from openstack_dashboard.dashboards.project.dns import reverse as dns_reverse
+from openstack_dashboard.dashboards.project.dns import tabs as dns_tabs
 
 LOG = logging.getLogger(__name__)
 
@@ -36,7 +50,11 @@ class DnsData(object):
         if getattr(self, 'records', None) is not None:
             self.record_data = ", ".join(self.records)
 
-class RecordSetsIndexView(tables.DataTableView):
+def _job_progress(job):
+    done = job['created'] + job['existing'] + job['failed']
+    return min(100, int(100 * done / job['total'])) if job['total'] else 100
+
+class RecordSetsIndexView(dns_profiling.ProfiledViewMixin, tables.DataTableView):
     table_class = dns_tables.DNSRecordSetTable
     template_name = 'project/dns/recordset_index.html'
     page_title = _('Zone Record Set Overview')
@@ -44,38 +62,68 @@ class RecordSetsIndexView(tables.DataTableView):
     def get_context_data(self, **kwargs):
         context = super(RecordSetsIndexView, self).get_context_data(**kwargs)
         context['zone_id'] = self.kwargs.get('zone_id')
+        context['reverse_jobs'] = [dict(job, progress=_job_progress(job), running=dns_reverse.is_running(job),
+                                        progress_url=reverse('horizon:project:dns:reverseprogress', args=(job['zone_id'], job['id'])))
+                                   for job in dns_reverse.get_zone_jobs(self.request, context['zone_id'])]
         return context
 
     def get_data(self):
         objects = []
+        zone_id = self.kwargs.get('zone_id')
         try:
-            for recordset in designate.get_recordsets(self.request, zone=self.kwargs.get('zone_id')):
-                objects.append(DnsData(**recordset))
+            recordsets = dns_prefetch.cached_recordsets(self.request, zone_id)
+            if recordsets is None:
+                recordsets = dns_snapshots.get_recordsets(self.request, zone_id)
+            dns_prefetch.remember_zone(self.request, zone_id)
+            with dns_profiling.phase('dnsdata'):
+                for recordset in recordsets:
+                    objects.append(DnsData(**recordset))
         except Exception as e:
             objects = []
 
         return objects
 
-class IndexView(tables.DataTableView):
+class IndexView(dns_profiling.ProfiledViewMixin, tables.DataTableView):
     table_class = dns_tables.DNSZonesTable
     template_name = 'project/dns/index.html'
     page_title = _("DNSaaS")
 
     def get_context_data(self, **kwargs):
         context = super(IndexView, self).get_context_data(**kwargs)
+        context['prefetch_urls'] = json.dumps([reverse('horizon:project:dns:recordsetprefetch', args=(zone_id,))
+                                               for zone_id in dns_prefetch.recent_zones(self.request)])
         return context
 
     def get_data(self):
         objects = []
         try:
-            for zone_object in designate.get_zones(self.request):
-                objects.append(DnsData(**zone_object))
+            if len(designate.get_dns_regions(self.request)) > 1:
+                zones, failed_regions = designate.get_zones_all_regions(self.request)
+                for region in failed_regions:
+                    messages.warning(self.request, _('[DNS]: Region %s is unavailable, its zones are not listed.') % region)
+            else:
+                region = getattr(self.request.user, 'services_region', None)
+                zones = [dict(zone_object, region=region) for zone_object in dns_snapshots.get_zones(self.request)]
+
+            with dns_profiling.phase('dnsdata'):
+                for zone_object in zones:
+                    objects.append(DnsData(**zone_object))
         except:
             objects = []
 
         return objects
 
-class ZoneCreateView(forms.ModalFormView):
+class ZoneDetailView(dns_profiling.ProfiledViewMixin, tabs.TabbedTableView):
+    tab_group_class = dns_tabs.ZoneDetailTabs
+    template_name = 'project/dns/zonedetail.html'
+    page_title = _("DNS Zone Details")
+
+    def get_context_data(self, **kwargs):
+        context = super(ZoneDetailView, self).get_context_data(**kwargs)
+        context['zone_id'] = self.kwargs.get('zone_id')
+        return context
+
+class ZoneCreateView(dns_profiling.ProfiledViewMixin, forms.ModalFormView):
     template_name = 'project/dns/zonecreate.html'
     modal_header = _("Create a new DNS Zone")
     form_id = "dns_zone_create_form"
@@ -85,7 +133,55 @@ class ZoneCreateView(forms.ModalFormView):
     success_url = reverse_lazy('horizon:project:dns:index')
     page_title = _("Create a new DNS Zone")
 
-class RecordSetCreateView(forms.ModalFormView):
+class BulkZoneCreateView(dns_profiling.ProfiledViewMixin, forms.ModalFormView):
+    template_name = 'project/dns/zonebulkcreate.html'
+    modal_header = _("Create DNS Zones in Bulk")
+    form_id = "dns_zone_bulkcreate_form"
+    form_class = dns_forms.BulkZoneCreateForm
+    submit_label = _("Create Zones")
+    submit_url = reverse_lazy("horizon:project:dns:zonebulkcreate")
+    success_url = reverse_lazy('horizon:project:dns:index')
+    page_title = _("Create DNS Zones in Bulk")
+
+    # handle() sets the form's batch_id inside form_valid, before the
+    # success url is built: keep the form around to read it then
+    def form_valid(self, form):
+        self._form = form
+        return super(BulkZoneCreateView, self).form_valid(form)
+
+    def get_success_url(self):
+        batch_id = getattr(getattr(self, '_form', None), 'batch_id', None)
+        if batch_id is None:
+            return self.success_url
+        return reverse('horizon:project:dns:zonebatch', args=(batch_id,))
+
+class BulkZoneBatchView(dns_profiling.ProfiledViewMixin, views.HorizonTemplateView):
+    template_name = 'project/dns/zonebatch.html'
+    page_title = _("DNS Zone Batch Activation")
+
+    def get_context_data(self, **kwargs):
+        context = super(BulkZoneBatchView, self).get_context_data(**kwargs)
+        batch = dns_onboarding.get_batch(self.request, self.kwargs.get('batch_id'))
+        if batch is None:
+            raise Http404
+        context['batch'] = batch
+        context['status_url'] = reverse('horizon:project:dns:zonebatchstatus', args=(batch['id'],))
+        return context
+
+# status of every zone of a batch, from one listing per poll
+class BulkZoneBatchStatusView(generic.View):
+    def get(self, request, batch_id):
+        batch = dns_onboarding.get_batch(request, batch_id)
+        if batch is None:
+            raise Http404
+
+        try:
+            batch = dns_onboarding.refresh_batch(request, batch)
+        except Exception as e:
+            LOG.info("Zone batch %s status poll failed: %s" % (batch_id, e))
+        return HttpResponse(json.dumps(batch), content_type='application/json')
+
+class RecordSetCreateView(dns_profiling.ProfiledViewMixin, forms.ModalFormView):
     template_name = 'project/dns/recordsetcreate.html'
     modal_header = _("Create a new Record in this Zone")
     form_id = "dns_recordset_create_form"
@@ -106,7 +202,7 @@ class RecordSetCreateView(forms.ModalFormView):
     def get_initial(self):
         return {'zone_id': self.kwargs['zone_id']}
 
-class RecordSetUpdateView(forms.ModalFormView):
+class RecordSetUpdateView(dns_profiling.ProfiledViewMixin, forms.ModalFormView):
     template_name = 'project/dns/recordsetupdate.html'
     modal_header = _("Update This Record")
     form_id = "dns_recordset_update_form"
@@ -131,7 +227,7 @@ class RecordSetUpdateView(forms.ModalFormView):
     def get_initial(self):
         return {'recordset_id': self.kwargs['recordset_id'], 'zone_id': self.kwargs['zone_id']}
 
-class ZoneUpdateView(forms.ModalFormView):
+class ZoneUpdateView(dns_profiling.ProfiledViewMixin, forms.ModalFormView):
     template_name = 'project/dns/zoneupdate.html'
     modal_header = _("Update DNS Zone")
     form_id = "dns_zone_update_form"
@@ -151,3 +247,105 @@ class ZoneUpdateView(forms.ModalFormView):
     def get_initial(self):
         return {'zone_id': self.kwargs['zone_id']}
 
+class FloatingIpPtrIndexView(dns_profiling.ProfiledViewMixin, tables.DataTableView):
+    table_class = dns_tables.FloatingIpPtrTable
+    template_name = 'project/dns/floatingipptr_index.html'
+    page_title = _("Floating IP PTR Records")
+
+    def get_data(self):
+        try:
+            objects = dns_floatingips.get_floatingip_ptrs(self.request)
+        except Exception:
+            objects = []
+            exceptions.handle(self.request, _('Unable to retrieve floating ip PTR records.'))
+
+        return objects
+
+class FloatingIpPtrSetView(dns_profiling.ProfiledViewMixin, forms.ModalFormView):
+    template_name = 'project/dns/floatingipptrset.html'
+    modal_header = _("Set the PTR Record of this Floating IP")
+    form_id = "dns_floatingip_ptr_set_form"
+    form_class = dns_forms.FloatingIpPtrSetForm
+    submit_label = _("Set PTR Record")
+    submit_url = 'horizon:project:dns:floatingipptrset'
+    success_url = reverse_lazy('horizon:project:dns:floatingipptrs')
+    cancel_url = reverse_lazy('horizon:project:dns:floatingipptrs')
+    page_title = _("Set PTR Record")
+
+    def get_context_data(self, **kwargs):
+        context = super(FloatingIpPtrSetView, self).get_context_data(**kwargs)
+        context['floatingip_id'] = self.kwargs.get('floatingip_id')
+        args = (self.kwargs.get('floatingip_id'),)
+        context['submit_url'] = reverse(self.submit_url, args=args)
+        return context
+
+    def get_initial(self):
+        return {'floatingip_id': self.kwargs['floatingip_id']}
+
+class FloatingIpPtrBulkSetView(dns_profiling.ProfiledViewMixin, forms.ModalFormView):
+    template_name = 'project/dns/floatingipptrbulkset.html'
+    modal_header = _("Set PTR Records in Bulk")
+    form_id = "dns_floatingip_ptr_bulkset_form"
+    form_class = dns_forms.FloatingIpPtrBulkSetForm
+    submit_label = _("Set PTR Records")
+    submit_url = reverse_lazy('horizon:project:dns:floatingipptrbulkset')
+    success_url = reverse_lazy('horizon:project:dns:floatingipptrs')
+    cancel_url = reverse_lazy('horizon:project:dns:floatingipptrs')
+    page_title = _("Set PTR Records in Bulk")
+
+class ReverseZoneGenerateView(dns_profiling.ProfiledViewMixin, forms.ModalFormView):
+    template_name = 'project/dns/reversegenerate.html'
+    modal_header = _("Generate PTR Records for a Network")
+    form_id = "dns_reverse_generate_form"
+    form_class = dns_forms.ReverseZoneGenerateForm
+    submit_label = _("Generate PTR Records")
+    submit_url = 'horizon:project:dns:reversegenerate'
+    success_url = 'horizon:project:dns:recordsets'
+    page_title = _("Generate PTR Records for a Network")
+
+    def get_success_url(self):
+        return reverse(self.success_url, args=(self.kwargs.get('zone_id'),))
+
+    def get_context_data(self, **kwargs):
+        context = super(ReverseZoneGenerateView, self).get_context_data(**kwargs)
+        context['zone_id'] = self.kwargs.get('zone_id')
+        args = (self.kwargs.get('zone_id'),)
+        context['submit_url'] = reverse(self.submit_url, args=args)
+        context['cancel_url'] = reverse(self.success_url, args=args)
+        return context
+
+    def get_initial(self):
+        return {'zone_id': self.kwargs['zone_id']}
+
+# progress of a PTR generation job, polled by the recordsets page
+class ReverseJobProgressView(generic.View):
+    def get(self, request, zone_id, job_id):
+        job = dns_reverse.get_job(request, job_id)
+        if job is None or job['zone_id'] != zone_id:
+            raise Http404
+
+        payload = dict(job, progress=_job_progress(job), running=dns_reverse.is_running(job))
+        return HttpResponse(json.dumps(payload), content_type='application/json')
+
+# warms the recordsets cache of a zone, requested by the zones index
+class RecordSetPrefetchView(generic.View):
+    def get(self, request, zone_id):
+        try:
+            dns_prefetch.prefetch_recordsets(request, zone_id)
+        except Exception as e:
+            LOG.info("Recordset prefetch for zone %s failed: %s" % (zone_id, e))
+        return HttpResponse(status=204)
+
+class ProfileDownloadView(generic.View):
+    def get(self, request, profile_id, kind):
+        if not getattr(request.user, 'is_superuser', False):
+            raise exceptions.NotAuthorized
+
+        path = dns_profiling.profile_path(profile_id, kind)
+        if path is None or not os.path.isfile(path):
+            raise Http404
+
+        with open(path, 'rb') as f:
+            response = HttpResponse(f.read(), content_type=dns_profiling.PROFILE_KINDS[kind])
+        response['Content-Disposition'] = 'attachment; filename="%s.%s"' % (profile_id, kind)
+        return response
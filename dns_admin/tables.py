@@ -0,0 +1,56 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import logging
+
+from django.utils.translation import ugettext_lazy as _
+
+from horizon import tables
+
+LOG = logging.getLogger(__name__)
+
+# filters are passed down to designate as list criteria
+class AdminZonesFilterAction(tables.FilterAction):
+    filter_type = "server"
+    filter_choices = (('name', _("Zone Name ="), True),
+                      ('status', _("Status ="), True),
+                      ('type', _("Zone Type ="), True),)
+
+class AdminDNSZonesTable(tables.DataTable):
+    STATUS_CHOICES = (
+        ("active", True),
+        ("pending", None),
+        ("error", False),
+        ("deleted", True),
+    )
+    ACTION_CHOICES = (
+        ("create", None),
+        ("update", None),
+        ("delete", None),
+        ("none", True),
+        ("error", False),
+    )
+    id = tables.Column('id', verbose_name=_('ID'), hidden=True)
+    project_name = tables.Column('project_name', verbose_name=_('Project'))
+    name = tables.Column('name', verbose_name=_('DNS Zone Name'))
+    email = tables.Column('email', verbose_name=_('Registrar E-Mail Address'))
+    status = tables.Column('status', verbose_name=_('Zone Health'), status=True, status_choices=STATUS_CHOICES)
+    action = tables.Column('action', verbose_name=_('Current Action'), status=True, status_choices=ACTION_CHOICES)
+    ttl = tables.Column('ttl', verbose_name=_('Zone TTL'))
+    type = tables.Column('type', verbose_name=_('Zone Type'))
+    serial = tables.Column('serial', verbose_name=_('Zone Serial'))
+
+    class Meta(object):
+        name = "dns_admin"
+        verbose_name = _("DNS as a Service: Zones in all Projects")
+        status_columns = ["status", "action"]
+        table_actions = (AdminZonesFilterAction, )
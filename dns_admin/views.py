@@ -0,0 +1,75 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import logging
+from concurrent import futures
+
+from django.utils.translation import ugettext_lazy as _
+from horizon import exceptions
+from horizon import tables
+
+from openstack_dashboard.api import designate
+from openstack_dashboard.api import keystone
+from openstack_dashboard.dashboards.admin.dns_admin import tables as dns_admin_tables
+from openstack_dashboard.dashboards.project.dns.tables import DnsData
+
+LOG = logging.getLogger(__name__)
+
+class AdminIndexView(tables.DataTableView):
+    table_class = dns_admin_tables.AdminDNSZonesTable
+    template_name = 'admin/dns_admin/index.html'
+    page_title = _("DNS Zones in all Projects")
+
+    def has_more_data(self, table):
+        return self._more
+
+    def get_filters(self):
+        filter_field = self.table.get_filter_field()
+        filter_string = self.table.get_filter_string()
+        if not (filter_field and filter_string):
+            return None
+
+        # designate stores status and type upper case
+        if filter_field in ('status', 'type'):
+            filter_string = filter_string.upper()
+        return {filter_field: filter_string}
+
+    def get_data(self):
+        marker = self.request.GET.get(dns_admin_tables.AdminDNSZonesTable._meta.pagination_param, None)
+        self._more = False
+
+        # the zone page and the project names do not depend on each other,
+        # fetch both at the same time.
+        with futures.ThreadPoolExecutor(max_workers=2) as executor:
+            zones_call = executor.submit(designate.get_all_zones, self.request, marker=marker, criterion=self.get_filters())
+            tenants_call = executor.submit(keystone.tenant_list, self.request)
+
+            try:
+                zones, self._more = zones_call.result()
+            except Exception:
+                zones = []
+                exceptions.handle(self.request, _('Unable to retrieve the list of DNS zones.'))
+
+            try:
+                tenants, has_more = tenants_call.result()
+            except Exception:
+                tenants = []
+                exceptions.handle(self.request, _('Unable to retrieve project information.'))
+
+        tenant_names = dict((t.id, t.name) for t in tenants)
+        objects = []
+        for zone_object in zones:
+            zone_data = DnsData(**zone_object)
+            zone_data.project_name = tenant_names.get(zone_object.get('project_id'), zone_object.get('project_id'))
+            objects.append(zone_data)
+
+        return objects
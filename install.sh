@@ -3,6 +3,7 @@
 SWPATH="/usr/share/openstack-dashboard/openstack_dashboard"
 APIPATH="$SWPATH/api"
 DASHPATH="$SWPATH/dashboards/project"
+ADMINDASHPATH="$SWPATH/dashboards/admin"
 
 for host in "$@"; do
   # install api integration python file
@@ -11,9 +12,11 @@ for host in "$@"; do
 
   # install dashboard
   scp -ri $SSHKEY dns root@$host:$DASHPATH/
+  scp -ri $SSHKEY dns_admin root@$host:$ADMINDASHPATH/
 
   # enable dashboard
   scp -i $SSHKEY enabled/_3032_network_dns_panel.py root@$host:$SWPATH/enabled/
+  scp -i $SSHKEY enabled/_3033_admin_dns_panel.py root@$host:$SWPATH/enabled/
 
   # install policy file
   scp -i $SSHKEY dns_policy.json root@$host:/etc/openstack-dashboard/dns_policy.json
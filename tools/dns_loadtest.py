@@ -0,0 +1,507 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+# Concurrent multi-user load test harness for the DNS panel.
+#
+# Spawns a local fake keystone/designate HTTP stub, logs in a number of
+# simulated operators against it and drives the DNS panel views from many
+# threads at once (the same way mod_wsgi would). For each view it reports
+# p50/p95/p99 latency, throughput and how many upstream calls a single page
+# load costs.
+#
+# Must run inside a working Horizon installation with the panel deployed:
+#
+#   cd /usr/share/openstack-dashboard
+#   DJANGO_SETTINGS_MODULE=openstack_dashboard.settings \
+#       python /path/to/tools/dns_loadtest.py --sessions 200 --iterations 5
+
+from __future__ import print_function
+
+import argparse
+import collections
+import json
+import os
+import re
+import sys
+import threading
+import time
+import traceback
+import uuid
+
+try:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+except ImportError:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+
+SCENARIOS = ('index', 'recordsets', 'zone-create', 'zone-update', 'recordset-create', 'recordset-update')
+
+
+# fake keystone + designate backend
+class StubBackend(object):
+    def __init__(self, projects, zones_per_project, recordsets_per_zone, latency):
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.counters = collections.Counter()
+        self.base_url = None
+        self.zones = {}
+        self.recordsets = {}
+        self.projects = ["loadtest-project-%d" % i for i in range(projects)]
+
+        for project_id in self.projects:
+            for z in range(zones_per_project):
+                zone = self._zone(project_id, "zone%d.%s.example.com." % (z, project_id))
+                self.recordsets[zone['id']] = dict((rs['id'], rs) for rs in
+                                                   (self._recordset(zone, "host%d.%s" % (r, zone['name']))
+                                                    for r in range(recordsets_per_zone)))
+
+    def _zone(self, project_id, name, email="hostmaster@example.com", ttl=3600, description=None):
+        zone = {'id': str(uuid.uuid4()), 'project_id': project_id, 'name': name, 'email': email,
+                'ttl': ttl, 'serial': int(time.time()), 'status': 'ACTIVE', 'action': 'NONE',
+                'type': 'PRIMARY', 'description': description, 'version': 1, 'pool_id': None,
+                'masters': [], 'transferred_at': None, 'created_at': None, 'updated_at': None,
+                'links': {}}
+        self.zones[zone['id']] = zone
+        return zone
+
+    def _recordset(self, zone, name, type_='A', records=None, ttl=None, description=None):
+        return {'id': str(uuid.uuid4()), 'zone_id': zone['id'], 'zone_name': zone['name'],
+                'project_id': zone['project_id'], 'name': name, 'type': type_,
+                'records': records or ['192.0.2.1'], 'ttl': ttl, 'description': description,
+                'status': 'ACTIVE', 'action': 'NONE', 'version': 1, 'created_at': None,
+                'updated_at': None, 'links': {}}
+
+    def count(self, key):
+        with self.lock:
+            self.counters[key] += 1
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.counters)
+
+    def token_v3(self, body):
+        scope = body.get('auth', {}).get('scope', {}).get('project', {})
+        project_id = scope.get('id') or self.projects[0]
+        return {'token': {
+            'methods': ['password', 'token'],
+            'expires_at': '2099-01-01T00:00:00.000000Z',
+            'issued_at': '2000-01-01T00:00:00.000000Z',
+            'user': {'id': 'loadtest-user', 'name': 'loadtest', 'domain': {'id': 'default', 'name': 'Default'}},
+            'project': {'id': project_id, 'name': project_id, 'domain': {'id': 'default', 'name': 'Default'}},
+            'roles': [{'id': 'admin', 'name': 'admin'}, {'id': 'member', 'name': '_member_'}],
+            'catalog': [
+                {'type': 'dns', 'name': 'designate', 'id': 'dns',
+                 'endpoints': [{'id': 'dns-public', 'interface': 'public', 'region': 'RegionOne',
+                                'region_id': 'RegionOne', 'url': self.base_url}]},
+                {'type': 'identity', 'name': 'keystone', 'id': 'identity',
+                 'endpoints': [{'id': 'identity-public', 'interface': 'public', 'region': 'RegionOne',
+                                'region_id': 'RegionOne', 'url': self.base_url + '/v3'}]},
+            ]}}
+
+    def token_v2(self, body):
+        project_id = body.get('auth', {}).get('tenantId') or self.projects[0]
+        return {'access': {
+            'token': {'id': uuid.uuid4().hex, 'expires': '2099-01-01T00:00:00Z',
+                      'tenant': {'id': project_id, 'name': project_id, 'enabled': True}},
+            'user': {'id': 'loadtest-user', 'name': 'loadtest', 'roles': [{'name': 'admin'}]},
+            'serviceCatalog': [
+                {'type': 'dns', 'name': 'designate',
+                 'endpoints': [{'region': 'RegionOne', 'publicURL': self.base_url}]}]}}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    backend = None
+    ZONE_RE = re.compile(r'^/zones/([^/]+)$')
+    RECORDSETS_RE = re.compile(r'^/zones/([^/]+)/recordsets$')
+    RECORDSET_RE = re.compile(r'^/zones/([^/]+)/recordsets/([^/]+)$')
+    NAMESERVERS_RE = re.compile(r'^/zones/([^/]+)/nameservers$')
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, payload=None, headers=None):
+        data = json.dumps(payload).encode('utf-8') if payload is not None else b''
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if not length:
+            return {}
+        return json.loads(self.rfile.read(length).decode('utf-8'))
+
+    def _project(self):
+        return self.headers.get('X-Auth-Token', '').split(':')[0]
+
+    def _dispatch(self, method):
+        backend = self.backend
+        path = self.path.split('?')[0].rstrip('/') or '/'
+
+        # keystone
+        if path == '/v3/auth/tokens' and method == 'POST':
+            backend.count('keystone')
+            token = backend.token_v3(self._body())
+            token_id = "%s:%s" % (token['token']['project']['id'], uuid.uuid4().hex)
+            return self._reply(201, token, {'X-Subject-Token': token_id})
+        if path == '/v2.0/tokens' and method == 'POST':
+            backend.count('keystone')
+            token = backend.token_v2(self._body())
+            token['access']['token']['id'] = "%s:%s" % (token['access']['token']['tenant']['id'], uuid.uuid4().hex)
+            return self._reply(200, token)
+
+        # designate version discovery
+        if path in ('/', '/v2'):
+            backend.count('discovery')
+            return self._reply(200, {'versions': {'values': [
+                {'id': 'v2', 'status': 'CURRENT', 'links': [{'rel': 'self', 'href': backend.base_url + '/v2/'}]}]}})
+
+        if path.startswith('/v2'):
+            path = path[3:]
+        backend.count('designate')
+        if backend.latency:
+            time.sleep(backend.latency)
+        return self._designate(method, path, backend)
+
+    def _designate(self, method, path, backend):
+        project_id = self._project()
+        if path == '/zones':
+            if method == 'GET':
+                return self._reply(200, {'zones': [z for z in backend.zones.values() if z['project_id'] == project_id],
+                                         'links': {}, 'metadata': {}})
+            body = self._body()
+            with backend.lock:
+                zone = backend._zone(project_id, body.get('name'), body.get('email'), body.get('ttl'), body.get('description'))
+                backend.recordsets[zone['id']] = {}
+            return self._reply(202, zone)
+
+        match = self.ZONE_RE.match(path)
+        if match:
+            zone = backend.zones.get(match.group(1))
+            if zone is None:
+                return self._reply(404, {'code': 404, 'type': 'zone_not_found', 'message': 'Could not find Zone'})
+            if method == 'PATCH':
+                zone.update(self._body())
+                zone['serial'] += 1
+                return self._reply(202, zone)
+            if method == 'DELETE':
+                return self._reply(202, zone)
+            return self._reply(200, zone)
+
+        match = self.NAMESERVERS_RE.match(path)
+        if match:
+            return self._reply(200, {'nameservers': [{'hostname': 'ns1.example.com.', 'priority': 1}]})
+
+        match = self.RECORDSETS_RE.match(path)
+        if match:
+            zone = backend.zones.get(match.group(1))
+            if zone is None:
+                return self._reply(404, {'code': 404, 'type': 'zone_not_found', 'message': 'Could not find Zone'})
+            if method == 'GET':
+                return self._reply(200, {'recordsets': list(backend.recordsets.get(zone['id'], {}).values()),
+                                         'links': {}, 'metadata': {}})
+            body = self._body()
+            with backend.lock:
+                rs = backend._recordset(zone, body.get('name'), body.get('type'), body.get('records'),
+                                        body.get('ttl'), body.get('description'))
+                backend.recordsets[zone['id']][rs['id']] = rs
+            return self._reply(202, rs)
+
+        match = self.RECORDSET_RE.match(path)
+        if match:
+            rs = backend.recordsets.get(match.group(1), {}).get(match.group(2))
+            if rs is None:
+                return self._reply(404, {'code': 404, 'type': 'recordset_not_found', 'message': 'Could not find RecordSet'})
+            if method == 'PUT':
+                rs.update(self._body())
+            return self._reply(200 if method == 'GET' else 202, rs)
+
+        if path == '/reverse/floatingips':
+            return self._reply(200, {'floatingips': [], 'links': {}, 'metadata': {}})
+
+        return self._reply(404, {'code': 404, 'type': 'not_found', 'message': path})
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def do_PUT(self):
+        self._dispatch('PUT')
+
+    def do_PATCH(self):
+        self._dispatch('PATCH')
+
+    def do_DELETE(self):
+        self._dispatch('DELETE')
+
+
+class ThreadingStubServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    request_queue_size = 512
+
+
+def start_stub(backend):
+    StubHandler.backend = backend
+    server = ThreadingStubServer(('127.0.0.1', 0), StubHandler)
+    backend.base_url = "http://127.0.0.1:%d" % server.server_address[1]
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    return server
+
+
+# horizon side
+def setup_horizon(backend):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'openstack_dashboard.settings')
+    import django
+    from django.conf import settings
+
+    if hasattr(django, 'setup'):
+        django.setup()
+
+    settings.DESIGNATE_KEYSTONE_ENDPOINT = backend.base_url
+    settings.OPENSTACK_KEYSTONE_URL = backend.base_url + '/v3'
+    settings.ALLOWED_HOSTS = ['*']
+
+
+class SimulatedSession(object):
+    """One logged in operator, with its own keystone token and django session."""
+
+    def __init__(self, backend, project_id):
+        from importlib import import_module
+        from django.conf import settings
+        from django.test import RequestFactory
+        from keystoneauth1.identity import v3 as v3_plugin
+        from keystoneauth1 import session as keystone_session
+        from openstack_auth import user as auth_user
+
+        self.factory = RequestFactory()
+        self.project_id = project_id
+        self.session_engine = import_module(settings.SESSION_ENGINE)
+
+        plugin = v3_plugin.Password(auth_url=backend.base_url + '/v3', username='loadtest', password='loadtest',
+                                    user_domain_id='default', project_id=project_id)
+        auth_ref = plugin.get_auth_ref(keystone_session.Session())
+        self.token = auth_user.Token(auth_ref)
+        self.auth_user = auth_user
+        self.endpoint = backend.base_url + '/v3'
+        self.session = self.session_engine.SessionStore()
+        self.session['domain_context'] = 'default'
+
+    def request(self, method, path, data=None):
+        from django.contrib.messages.storage import default_storage
+
+        if method == 'POST':
+            request = self.factory.post(path, data or {})
+        else:
+            request = self.factory.get(path, data or {})
+        request.session = self.session
+        request.user = self.auth_user.create_user_from_token(request, self.token, self.endpoint)
+        request.horizon = {'dashboard': None, 'panel': None, 'async_messages': []}
+        request._messages = default_storage(request)
+        return request
+
+
+class LoadTest(object):
+    def __init__(self, backend, sessions, iterations):
+        from django.core.urlresolvers import resolve, reverse
+
+        self.backend = backend
+        self.sessions = sessions
+        self.iterations = iterations
+        self.resolve = resolve
+        self.reverse = reverse
+        self.zone_of = dict((s.project_id, [z for z in backend.zones.values() if z['project_id'] == s.project_id])
+                            for s in sessions)
+
+    def _pick(self, session, n):
+        zones = self.zone_of[session.project_id]
+        zone = zones[n % len(zones)]
+        recordsets = list(self.backend.recordsets[zone['id']].values())
+        return zone, (recordsets[n % len(recordsets)] if recordsets else None)
+
+    def _call(self, session, method, url, data=None):
+        match = self.resolve(url)
+        response = match.func(session.request(method, url, data), *match.args, **match.kwargs)
+        if hasattr(response, 'render') and not getattr(response, 'is_rendered', True):
+            response.render()
+        if response.status_code >= 500:
+            raise RuntimeError("HTTP %d from %s" % (response.status_code, url))
+        return response
+
+    def step(self, scenario, session, n):
+        zone, recordset = self._pick(session, n)
+        if scenario == 'index':
+            return self._call(session, 'GET', self.reverse('horizon:project:dns:index'))
+        if scenario == 'recordsets':
+            return self._call(session, 'GET', self.reverse('horizon:project:dns:recordsets', args=(zone['id'],)))
+        if scenario == 'zone-create':
+            return self._call(session, 'POST', self.reverse('horizon:project:dns:zonecreate'),
+                              {'zonename': 'lt%s.example.com.' % uuid.uuid4().hex[:12],
+                               'email_address': 'hostmaster@example.com', 'ttl': 3600, 'description': 'load test'})
+        if scenario == 'zone-update':
+            url = self.reverse('horizon:project:dns:zoneupdate', args=(zone['id'],))
+            self._call(session, 'GET', url)
+            return self._call(session, 'POST', url,
+                              {'zone_id': zone['id'], 'zonename': zone['name'], 'email_address': zone['email'],
+                               'ttl': 7200, 'description': 'load test'})
+        if scenario == 'recordset-create':
+            url = self.reverse('horizon:project:dns:recordsetcreate', args=(zone['id'],))
+            self._call(session, 'GET', url)
+            return self._call(session, 'POST', url,
+                              {'zone_id': zone['id'], 'recordname': 'lt%s' % uuid.uuid4().hex[:8], 'ttl': 300,
+                               'record_value': '192.0.2.10', 'recordtype': 'A', 'description': 'load test'})
+        if scenario == 'recordset-update':
+            if recordset is None:
+                return None
+            url = self.reverse('horizon:project:dns:recordsetupdate', args=(zone['id'], recordset['id']))
+            self._call(session, 'GET', url)
+            return self._call(session, 'POST', url,
+                              {'zone_id': zone['id'], 'recordset_id': recordset['id'], 'recordname': recordset['name'],
+                               'record_value': '192.0.2.20', 'recordtype': 'A', 'ttl': 600, 'description': 'load test'})
+        raise ValueError("unknown scenario %s" % scenario)
+
+    def run(self, scenario):
+        latencies = []
+        errors = collections.Counter()
+        lock = threading.Lock()
+        start_gate = threading.Event()
+
+        def worker(session):
+            start_gate.wait()
+            for n in range(self.iterations):
+                began = time.time()
+                try:
+                    self.step(scenario, session, n)
+                    elapsed = time.time() - began
+                    with lock:
+                        latencies.append(elapsed)
+                except Exception as e:
+                    message = "%s: %s" % (type(e).__name__, e)
+                    with lock:
+                        errors[message] += 1
+                        if errors[message] == 1:
+                            traceback.print_exc()
+
+        threads = [threading.Thread(target=worker, args=(s,)) for s in self.sessions]
+        for t in threads:
+            t.daemon = True
+            t.start()
+
+        before = self.backend.snapshot()
+        began = time.time()
+        start_gate.set()
+        for t in threads:
+            t.join()
+        wall = time.time() - began
+        after = self.backend.snapshot()
+
+        upstream = dict((k, after.get(k, 0) - before.get(k, 0)) for k in set(after) | set(before))
+        return ScenarioResult(scenario, latencies, errors, wall, upstream)
+
+
+class ScenarioResult(object):
+    def __init__(self, scenario, latencies, errors, wall, upstream):
+        self.scenario = scenario
+        self.latencies = sorted(latencies)
+        self.errors = errors
+        self.wall = wall
+        self.upstream = upstream
+
+    @property
+    def requests(self):
+        return len(self.latencies) + sum(self.errors.values())
+
+    def percentile(self, pct):
+        if not self.latencies:
+            return 0.0
+        # nearest-rank percentile
+        rank = int(round(pct / 100.0 * len(self.latencies) + 0.5)) - 1
+        return self.latencies[max(0, min(rank, len(self.latencies) - 1))]
+
+    def per_request(self, key):
+        return float(self.upstream.get(key, 0)) / self.requests if self.requests else 0.0
+
+    def as_dict(self):
+        return {'scenario': self.scenario, 'requests': self.requests, 'errors': dict(self.errors),
+                'p50_ms': self.percentile(50) * 1000, 'p95_ms': self.percentile(95) * 1000,
+                'p99_ms': self.percentile(99) * 1000,
+                'throughput_rps': self.requests / self.wall if self.wall else 0.0,
+                'keystone_per_request': self.per_request('keystone'),
+                'designate_per_request': self.per_request('designate'),
+                'upstream': self.upstream}
+
+
+def print_report(results, sessions):
+    print("\nDNS panel load test: %d concurrent sessions\n" % sessions)
+    header = "%-18s %8s %7s %9s %9s %9s %10s %10s %10s" % (
+        'view', 'requests', 'errors', 'p50 ms', 'p95 ms', 'p99 ms', 'req/s', 'ks/req', 'dns/req')
+    print(header)
+    print('-' * len(header))
+    for r in results:
+        d = r.as_dict()
+        print("%-18s %8d %7d %9.1f %9.1f %9.1f %10.1f %10.2f %10.2f" % (
+            d['scenario'], d['requests'], sum(r.errors.values()), d['p50_ms'], d['p95_ms'], d['p99_ms'],
+            d['throughput_rps'], d['keystone_per_request'], d['designate_per_request']))
+    for r in results:
+        for message, count in r.errors.most_common(5):
+            print("  [%s] %dx %s" % (r.scenario, count, message))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent load test for the DNS panel views.")
+    parser.add_argument('--sessions', type=int, default=200, help="concurrent simulated operators")
+    parser.add_argument('--iterations', type=int, default=5, help="requests per session and view")
+    parser.add_argument('--projects', type=int, default=10, help="projects the sessions are spread over")
+    parser.add_argument('--zones', type=int, default=20, help="zones per project in the stub")
+    parser.add_argument('--recordsets', type=int, default=50, help="recordsets per zone in the stub")
+    parser.add_argument('--upstream-latency', type=float, default=20.0, help="designate stub latency in ms")
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help="comma separated list of views to drive")
+    parser.add_argument('--json', dest='json_path', help="also write results to this file as json")
+    args = parser.parse_args(argv)
+
+    scenarios = [s.strip() for s in args.scenarios.split(',') if s.strip()]
+    for s in scenarios:
+        if s not in SCENARIOS:
+            parser.error("unknown scenario %s, choose from %s" % (s, ', '.join(SCENARIOS)))
+
+    backend = StubBackend(args.projects, args.zones, args.recordsets, args.upstream_latency / 1000.0)
+    server = start_stub(backend)
+    setup_horizon(backend)
+
+    print("stub listening on %s, logging in %d sessions..." % (backend.base_url, args.sessions))
+    sessions = [SimulatedSession(backend, backend.projects[i % len(backend.projects)]) for i in range(args.sessions)]
+
+    loadtest = LoadTest(backend, sessions, args.iterations)
+    results = []
+    for scenario in scenarios:
+        print("running %s..." % scenario)
+        results.append(loadtest.run(scenario))
+
+    print_report(results, args.sessions)
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump([r.as_dict() for r in results], f, indent=2)
+
+    server.shutdown()
+    return 1 if any(r.errors for r in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())